@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark of filter_datum against the previous per-field implementation.
+
+Usage: ./bench_filter_datum.py [number_of_lines]
+"""
+import re
+import sys
+import time
+from typing import List
+
+filter_datum = __import__('filtered_logger').filter_datum
+PII_FIELDS = __import__('filtered_logger').PII_FIELDS
+
+
+def legacy_filter_datum(fields: List[str], redaction: str,
+                        message: str, separator: str) -> str:
+    """ One re.sub per field, as filter_datum used to do """
+    for field in fields:
+        message = re.sub(
+            rf"{field}=.*?{separator}",
+            f"{field}={redaction}{separator}",
+            message
+        )
+    return message
+
+
+def run(func, lines: List[str]) -> float:
+    """ Returns the number of lines redacted per second by func """
+    start = time.perf_counter()
+    for line in lines:
+        func(PII_FIELDS, "***", line, ";")
+    return len(lines) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lines = ["name=user{0};email=user{0}@example.com;phone=555-{0:04d};"
+             "ssn=000-00-{0:04d};password=pwd{0};ip=10.0.{1}.{2};"
+             "last_login=2019-11-14T06:14:24;user_agent=Chrome/{0};"
+             .format(i % 10000, i % 256, i % 199) for i in range(count)]
+
+    for line in lines[:1000]:
+        assert filter_datum(PII_FIELDS, "***", line, ";") == \
+            legacy_filter_datum(PII_FIELDS, "***", line, ";")
+
+    legacy = run(legacy_filter_datum, lines)
+    current = run(filter_datum, lines)
+    print("lines:   {}".format(count))
+    print("legacy:  {:.0f} lines/s".format(legacy))
+    print("current: {:.0f} lines/s ({:.2f}x)".format(current,
+                                                     current / legacy))
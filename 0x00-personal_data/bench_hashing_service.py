@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the hashing service throughput against its thread count.
+
+Usage: ./bench_hashing_service.py [number_of_hashes] [rounds] [max_threads]
+"""
+import os
+import sys
+import time
+
+HashingService = __import__('hashing_service').HashingService
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    max_threads = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+    passwords = ["MyAmazingPassw0rd{}".format(i) for i in range(count)]
+
+    threads = 1
+    while threads <= max_threads:
+        with HashingService(max_workers=threads, rounds=rounds) as service:
+            start = time.perf_counter()
+            service.hash_many(passwords)
+            elapsed = time.perf_counter() - start
+        print("{:2d} threads: {:.1f} hashes/s".format(threads,
+                                                      count / elapsed))
+        threads *= 2
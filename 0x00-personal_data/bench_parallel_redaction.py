@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the parallel export against the serial one, from 1 to N cores.
+
+Usage: ./bench_parallel_redaction.py [number_of_rows] [max_workers]
+"""
+import io
+import logging
+import os
+import sys
+import time
+
+filtered_logger = __import__('filtered_logger')
+
+
+class FakeCursor:
+    """ Unbuffered cursor stand-in serving synthetic users rows """
+
+    def __init__(self, count: int):
+        """ Initialize the cursor with count rows to serve """
+        self.count = count
+        self.position = 0
+
+    def fetchmany(self, size: int) -> list:
+        """ Returns the next size rows """
+        end = min(self.position + size, self.count)
+        rows = [{"name": "user{}".format(i),
+                 "email": "user{}@example.com".format(i),
+                 "phone": "555-{:04d}".format(i % 10000),
+                 "ssn": "000-00-{:04d}".format(i % 10000),
+                 "password": "pwd{}".format(i),
+                 "ip": "10.0.{}.{}".format(i % 256, i % 199),
+                 "last_login": "2019-11-14 06:14:24",
+                 "user_agent": "Chrome/{}".format(i)}
+                for i in range(self.position, end)]
+        self.position = end
+        return rows
+
+
+def make_logger(stream: io.StringIO) -> logging.Logger:
+    """ Returns a user_data-like logger writing to stream """
+    logger = logging.getLogger("bench_user_data")
+    logger.handlers = []
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(filtered_logger.RedactingFormatter(
+        fields=filtered_logger.PII_FIELDS))
+    logger.addHandler(handler)
+    return logger
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    batch_size = 1000
+
+    logger = make_logger(io.StringIO())
+    cursor = FakeCursor(count)
+    start = time.perf_counter()
+    for row in filtered_logger.iter_rows(cursor, batch_size):
+        logger.info(filtered_logger.format_row(row))
+    serial = time.perf_counter() - start
+    print("serial:    {:.2f}s".format(serial))
+
+    workers = 1
+    while workers <= max_workers:
+        logger = make_logger(io.StringIO())
+        start = time.perf_counter()
+        filtered_logger.export_parallel(FakeCursor(count), logger,
+                                        batch_size, workers)
+        elapsed = time.perf_counter() - start
+        print("{:2d} workers: {:.2f}s ({:.2f}x)".format(
+            workers, elapsed, serial / elapsed))
+        workers *= 2
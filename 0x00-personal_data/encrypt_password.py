@@ -3,20 +3,23 @@
 Module for password hashing.
 """
 
+import time
+
 import bcrypt
 
 
-def hash_password(password: str) -> bytes:
+def hash_password(password: str, rounds: int = 12) -> bytes:
     """
     Hashes a password with a random salt using bcrypt.
 
     Args:
         password (str): The plain text password to hash.
+        rounds (int): The bcrypt work factor (log2 of the iterations).
 
     Returns:
         bytes: The salted, hashed password.
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed
 
@@ -33,3 +36,48 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
         bool: True if the password matches the hash, False otherwise.
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def needs_rehash(hashed_password: bytes, rounds: int = 12) -> bool:
+    """
+    Tells whether a hash was made with a lower work factor than rounds.
+
+    Hashes with a higher work factor are kept, so that a node calibrated
+    to fewer rounds never weakens them.
+
+    Args:
+        hashed_password (bytes): The stored hashed password.
+        rounds (int): The minimum work factor hashes should use.
+
+    Returns:
+        bool: True if the password should be hashed again on next login.
+    """
+    try:
+        return int(hashed_password.split(b'$')[2]) < rounds
+    except (AttributeError, IndexError, ValueError):
+        return True
+
+
+def calibrate_rounds(target_ms: float = 100, minimum: int = 4) -> int:
+    """
+    Finds the highest work factor hashing within a latency budget.
+
+    Each extra round doubles the hashing time, so hashes are timed from
+    the minimum work factor up until the next one would exceed the budget.
+
+    Args:
+        target_ms (float): The hashing time budget in milliseconds.
+        minimum (int): The lowest work factor to return.
+
+    Returns:
+        int: The work factor to use on this machine.
+    """
+    rounds = max(minimum, 4)
+    while rounds < 31:
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms * 2 > target_ms:
+            break
+        rounds += 1
+    return rounds
@@ -3,12 +3,48 @@
 Module for filtering log messages.
 """
 
+import atexit
+import datetime
+import json
 import re
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterator, List, Sequence
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import os
+import queue
+import threading
+import time
 import mysql.connector
 from mysql.connector import connection
+from mysql.connector.errors import PoolError
+
+
+@lru_cache(maxsize=None)
+def _redactor(fields: Sequence[str], redaction: str,
+              separator: str) -> Callable[[str], str]:
+    """
+    Builds a single-pass redaction function for a set of fields.
+
+    All fields are compiled into one alternation pattern, so a message is
+    scanned once whatever the number of fields. A callable replacement is
+    used as it is much cheaper than expanding a template on every match.
+    The result is cached per (fields, redaction, separator) tuple.
+
+    Args:
+        fields (Sequence[str]): The fields to obfuscate, as a tuple.
+        redaction (str): The string to replace the field values with.
+        separator (str): The character separating fields in the log message.
+
+    Returns:
+        Callable[[str], str]: A function redacting a message.
+    """
+    pattern = re.compile(r"({})=.*?{}".format(
+        "|".join(re.escape(field) for field in fields), re.escape(separator)))
+    suffix = "={}{}".format(redaction, separator)
+    return partial(pattern.sub, lambda match: match[1] + suffix)
 
 
 def filter_datum(fields: List[str], redaction: str,
@@ -25,33 +61,101 @@ def filter_datum(fields: List[str], redaction: str,
     Returns:
         str: The obfuscated log message.
     """
-    for field in fields:
-        message = re.sub(
-            rf"{field}=.*?{separator}",
-            f"{field}={redaction}{separator}",
-            message
-        )
-    return message
+    if not fields:
+        return message
+    return _redactor(tuple(fields), redaction, separator)(message)
+
+
+@lru_cache(maxsize=None)
+def _prefixes(fields: Sequence[str]) -> Sequence[str]:
+    """
+    Returns the `field=` prefixes a message must contain to need redaction.
+
+    Args:
+        fields (Sequence[str]): The fields to obfuscate, as a tuple.
+
+    Returns:
+        Sequence[str]: The prefix of each field.
+    """
+    return tuple("{}=".format(field) for field in fields)
+
+
+def _json_default(obj) -> str:
+    """
+    Serializes the values json doesn't know, dates in ISO 8601.
+
+    Args:
+        obj: The value to serialize.
+
+    Returns:
+        str: The string representation of obj.
+    """
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dumps(obj: Dict) -> str:
+    """
+    Serializes an object to a compact JSON line.
+
+    Args:
+        obj (Dict): The object to serialize.
+
+    Returns:
+        str: The compact JSON representation of obj.
+    """
+    return json.dumps(obj, default=_json_default, separators=(",", ":"))
+
+
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord(
+    "", logging.INFO, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+@lru_cache(maxsize=None)
+def _field_set(fields: Sequence[str]) -> frozenset:
+    """
+    Returns the fields as a set, for redaction of structured messages.
+
+    Args:
+        fields (Sequence[str]): The fields to obfuscate, as a tuple.
+
+    Returns:
+        frozenset: The set of fields.
+    """
+    return frozenset(fields)
 
 
 class RedactingFormatter(logging.Formatter):
     """ Redacting Formatter class
+
+    Messages are first scanned for the `field=` prefixes of the fields, and
+    only the ones containing at least one of them go through filter_datum.
+    The hits and misses of that precheck are counted, see stats().
+
+    Records whose message is a dict, or every record when structured is
+    set, are formatted as JSON lines instead. Dict messages and `extra`
+    fields are redacted by key, without going through a string.
     """
 
     REDACTION = "***"
     FORMAT = "[HOLBERTON] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
     SEPARATOR = ";"
 
-    def __init__(self, fields: List[str]):
+    def __init__(self, fields: List[str], structured: bool = False):
         """
         Initialize the RedactingFormatter.
 
         Args:
             fields (List[str]): A list of field names to be obfuscated
             in log messages.
+            structured (bool): Whether to format every record as JSON.
         """
         super(RedactingFormatter, self).__init__(self.FORMAT)
         self.fields = fields
+        self.structured = structured
+        self.hits = 0
+        self.misses = 0
 
     def format(self, record: logging.LogRecord) -> str:
         """
@@ -63,47 +167,610 @@ class RedactingFormatter(logging.Formatter):
         Returns:
             str: The formatted log message with sensitive fields obfuscated.
         """
-        original_message = super().format(record)
+        if self.structured or isinstance(record.msg, dict):
+            return self.format_structured(record)
+        return self.redact(super().format(record))
+
+    def format_structured(self, record: logging.LogRecord) -> str:
+        """
+        Formats the specified record as a JSON line.
+
+        The message is a dict when record.msg is one, merged with the
+        `extra` fields of the record, and redacted by key. Text messages
+        are redacted as usual, and so are the traceback and stack of the
+        record, logged under exception and stack.
+
+        Args:
+            record (logging.LogRecord): The log record to be formatted.
+
+        Returns:
+            str: The JSON line with sensitive fields obfuscated.
+        """
+        if isinstance(record.msg, dict):
+            message = dict(record.msg)
+        else:
+            message = {"text": self.redact(record.getMessage())}
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                message[key] = value
+        fields = _field_set(tuple(self.fields))
+        for key in fields.intersection(message):
+            message[key] = self.REDACTION
+        line = {"time": self.formatTime(record),
+                "logger": record.name,
+                "level": record.levelname,
+                "message": message}
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line["exception"] = self.redact(record.exc_text)
+        if record.stack_info:
+            line["stack"] = self.redact(self.formatStack(record.stack_info))
+        return _dumps(line)
+
+    def redact(self, message: str) -> str:
+        """
+        Obfuscates the fields of a text message, if it contains any.
+
+        Args:
+            message (str): The text message.
+
+        Returns:
+            str: The message with sensitive fields obfuscated.
+        """
+        for prefix in _prefixes(tuple(self.fields)):
+            if prefix in message:
+                break
+        else:
+            self.misses += 1
+            return message
+        self.hits += 1
         return filter_datum(self.fields, self.REDACTION,
-                            original_message, self.SEPARATOR)
+                            message, self.SEPARATOR)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the counters of the PII precheck.
+
+        Returns:
+            Dict[str, float]: The number of messages which needed redaction
+            (hits), the number which did not (misses) and the hit ratio.
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0}
 
 
 PII_FIELDS = ("name", "email", "ssn", "phone", "password")
 
 
+class BoundedQueueHandler(QueueHandler):
+    """ QueueHandler feeding a bounded queue
+
+    Records are queued unformatted, so redaction and I/O happen on the
+    QueueListener thread. When the queue is full, the overflow policy
+    decides what happens:
+    - block: the caller waits for room in the queue
+    - drop-oldest: the oldest queued record is dropped
+    - sample: once the queue is half full, only one record out of
+      sample_rate is queued, and records are dropped while it is full
+    """
+
+    POLICIES = ("block", "drop-oldest", "sample")
+
+    def __init__(self, maxsize: int = 10000, policy: str = "block",
+                 sample_rate: int = 10):
+        """
+        Initialize the BoundedQueueHandler.
+
+        Args:
+            maxsize (int): The maximum number of queued records.
+            policy (str): The overflow policy, one of POLICIES.
+            sample_rate (int): The sampling ratio of the sample policy.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError("unknown overflow policy: {}".format(policy))
+        super(BoundedQueueHandler, self).__init__(queue.Queue(maxsize))
+        self.policy = policy
+        self.sample_rate = max(sample_rate, 1)
+        self.dropped = 0
+        self._sampled = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merges the message arguments without formatting the record.
+
+        Args:
+            record (logging.LogRecord): The record to queue.
+
+        Returns:
+            logging.LogRecord: The record, formatted later by the listener.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Queues a record according to the overflow policy.
+
+        Args:
+            record (logging.LogRecord): The record to queue.
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        if self.policy == "sample" and \
+                self.queue.qsize() * 2 >= self.queue.maxsize:
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self.dropped += 1
+                return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.policy != "drop-oldest":
+                self.dropped += 1
+                return
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+        except queue.Empty:
+            pass
+        self.dropped += 1
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the instrumentation counters of the handler.
+
+        Returns:
+            Dict[str, int]: The queue depth, the queue size and the number
+            of records dropped so far.
+        """
+        return {"queue_depth": self.queue.qsize(),
+                "queue_size": self.queue.maxsize,
+                "dropped": self.dropped}
+
+
+class BlockingQueueListener(QueueListener):
+    """ QueueListener waiting for room in a bounded queue when stopped
+
+    The stock listener queues its stop sentinel with put_nowait, which
+    fails when the queue is full, leaving the remaining records unwritten.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Queues the sentinel stopping the listener, after every record
+        already queued.
+        """
+        self.queue.put(self._sentinel)
+
+
+def _structured_logs() -> bool:
+    """ Whether PERSONAL_DATA_LOG_FORMAT asks for JSON lines """
+    return os.getenv("PERSONAL_DATA_LOG_FORMAT", "text") == "json"
+
+
 def get_logger() -> logging.Logger:
     """
     Creates and configures a logger object for user data.
 
+    The logger is only configured once, later calls return it unchanged.
+    When PERSONAL_DATA_LOG_ASYNC is set to 1, records go through a
+    BoundedQueueHandler and are redacted and written by a background
+    QueueListener. The queue is sized by PERSONAL_DATA_LOG_QUEUE_SIZE and
+    its overflow policy set by PERSONAL_DATA_LOG_OVERFLOW and
+    PERSONAL_DATA_LOG_SAMPLE_RATE. Records are formatted as JSON lines when
+    PERSONAL_DATA_LOG_FORMAT is set to json.
+
     Returns:
         logging.Logger: A configured logger instance for user data.
     """
     logger = logging.getLogger("user_data")
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.INFO)
     logger.propagate = False
 
     stream_handler = logging.StreamHandler()
-    formatter = RedactingFormatter(fields=PII_FIELDS)
+    formatter = RedactingFormatter(fields=PII_FIELDS,
+                                   structured=_structured_logs())
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    if os.getenv("PERSONAL_DATA_LOG_ASYNC", "0") != "1":
+        logger.addHandler(stream_handler)
+        return logger
+
+    queue_handler = BoundedQueueHandler(
+        maxsize=int(os.getenv("PERSONAL_DATA_LOG_QUEUE_SIZE", "10000")),
+        policy=os.getenv("PERSONAL_DATA_LOG_OVERFLOW", "block"),
+        sample_rate=int(os.getenv("PERSONAL_DATA_LOG_SAMPLE_RATE", "10")))
+    queue_handler.listener = BlockingQueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True)
+    queue_handler.listener.start()
+    atexit.register(queue_handler.listener.stop)
+    logger.addHandler(queue_handler)
 
     return logger
 
 
-def get_db() -> mysql.connector.connection.MySQLConnection:
-    """ returns a connector to the database """
-    db_host = os.getenv("PERSONAL_DATA_DB_HOST", "localhost")
-    db_name = os.getenv("PERSONAL_DATA_DB_NAME", "")
-    db_user = os.getenv("PERSONAL_DATA_DB_USERNAME", "root")
-    db_pwd = os.getenv("PERSONAL_DATA_DB_PASSWORD", "")
-    connection = mysql.connector.connect(
-        host=db_host,
-        port=3306,
-        user=db_user,
-        password=db_pwd,
-        database=db_name,
-    )
-    return connection
+class PooledConnection:
+    """ Connection borrowed from a ConnectionPool
+
+    Behaves like the underlying connection, except that close() hands it
+    back to its pool instead of closing it. Leaving a with block, or
+    dropping the last reference to it, closes it too.
+    """
+
+    def __init__(self, pool: "ConnectionPool", cnx):
+        """
+        Initialize the PooledConnection.
+
+        Args:
+            pool (ConnectionPool): The pool the connection belongs to.
+            cnx: The underlying connection.
+        """
+        self._pool = pool
+        self._cnx = cnx
+
+    def __getattr__(self, name: str):
+        """ Delegates everything else to the underlying connection """
+        if self._cnx is None:
+            raise AttributeError("connection returned to its pool")
+        return getattr(self._cnx, name)
+
+    def __enter__(self) -> "PooledConnection":
+        """ Returns the connection itself """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """ Returns the connection to its pool """
+        self.close()
+
+    def __del__(self):
+        """ Returns a connection dropped without close() to its pool """
+        if self.__dict__.get("_cnx") is not None:
+            self.close()
+
+    def close(self) -> None:
+        """ Returns the connection to its pool """
+        if self._cnx is not None:
+            cnx, self._cnx = self._cnx, None
+            self._pool.release(cnx)
+
+
+class ConnectionPool:
+    """ Bounded pool of database connections
+
+    Idle connections are reused most recently released first, and their
+    pending transaction is rolled back when released. A connection
+    idle for longer than idle_timeout seconds, or failing its health check,
+    is closed and replaced by a new one when it is next borrowed.
+    Once size connections are borrowed, borrowers wait up to timeout
+    seconds for one to be released, then get a PoolError.
+    """
+
+    def __init__(self, connect: Callable, size: int = 5,
+                 idle_timeout: float = 300, timeout: float = 10, **config):
+        """
+        Initialize the ConnectionPool.
+
+        Args:
+            connect (Callable): Opens a new connection, called with config.
+            size (int): The maximum number of open connections.
+            idle_timeout (float): Seconds after which an idle connection
+            is discarded.
+            timeout (float): Seconds to wait for a connection when all
+            are in use, None to wait forever.
+            **config: The connection arguments given to connect.
+        """
+        self._connect = partial(connect, **config)
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get_connection(self) -> PooledConnection:
+        """
+        Borrows a connection, waiting up to timeout seconds for one to be
+        released if all size connections are in use.
+
+        Returns:
+            PooledConnection: A healthy connection.
+
+        Raises:
+            PoolError: If no connection was released in time.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError("Failed getting connection; pool exhausted")
+        try:
+            return PooledConnection(self, self._checkout())
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, cnx) -> None:
+        """
+        Puts a borrowed connection back in the pool, once its pending
+        transaction is rolled back so that the next borrower starts a
+        fresh one. A connection failing the rollback is closed instead.
+
+        Args:
+            cnx: The underlying connection.
+        """
+        try:
+            rollback = getattr(cnx, "rollback", None)
+            if rollback is not None:
+                rollback()
+        except Exception:
+            try:
+                cnx.close()
+            except Exception:
+                pass
+        else:
+            self._idle.put((cnx, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        """ Returns an idle healthy connection, or a new one """
+        while True:
+            try:
+                cnx, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            expired = time.monotonic() - released_at > self.idle_timeout
+            if not expired and self._is_healthy(cnx):
+                return cnx
+            try:
+                cnx.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_healthy(cnx) -> bool:
+        """ Pings the server when the connection knows how to """
+        is_connected = getattr(cnx, "is_connected", None)
+        if is_connected is None:
+            return True
+        try:
+            return bool(is_connected())
+        except Exception:
+            return False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """ returns the connection pool of the database, creating it once """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                mysql.connector.connect,
+                size=int(os.getenv("PERSONAL_DATA_DB_POOL_SIZE", "5")),
+                idle_timeout=float(
+                    os.getenv("PERSONAL_DATA_DB_POOL_IDLE_TIMEOUT", "300")),
+                timeout=float(
+                    os.getenv("PERSONAL_DATA_DB_POOL_TIMEOUT", "10")),
+                host=os.getenv("PERSONAL_DATA_DB_HOST", "localhost"),
+                port=int(os.getenv("PERSONAL_DATA_DB_PORT", "3306")),
+                user=os.getenv("PERSONAL_DATA_DB_USERNAME", "root"),
+                password=os.getenv("PERSONAL_DATA_DB_PASSWORD", ""),
+                database=os.getenv("PERSONAL_DATA_DB_NAME", ""),
+            )
+        return _pool
+
+
+def get_db() -> PooledConnection:
+    """ returns a connector to the database, borrowed from the pool
+
+    Closing the connector hands it back to the pool.
+    """
+    return get_pool().get_connection()
+
+
+def iter_batches(cursor, batch_size: int) -> Iterator[List[Dict]]:
+    """
+    Streams the rows of an executed query, batch_size rows at a time.
+
+    Args:
+        cursor: An unbuffered cursor on which a query has been executed.
+        batch_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        List[Dict]: Each batch of rows of the result set.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def iter_rows(cursor, batch_size: int) -> Iterator[Dict]:
+    """
+    Streams the rows of an executed query one by one.
+
+    Args:
+        cursor: An unbuffered cursor on which a query has been executed.
+        batch_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        Dict: Each row of the result set.
+    """
+    for rows in iter_batches(cursor, batch_size):
+        yield from rows
+
+
+def format_row(row: Dict) -> str:
+    """
+    Flattens a row into a `field=value; ` log message.
+
+    Args:
+        row (Dict): A row as returned by a dictionary cursor.
+
+    Returns:
+        str: The log message for the row.
+    """
+    return "; ".join(f"{field}={value}" for field, value in row.items())
+
+
+def redact_rows(rows: List[Dict], name: str = "user_data",
+                structured: bool = False,
+                formatter: logging.Formatter = None) -> List[str]:
+    """
+    Formats a batch of rows into redacted log lines.
+
+    This runs in the worker processes of export_parallel, and produces
+    exactly what the user_data logger would write for each row.
+
+    Args:
+        rows (List[Dict]): A batch of rows from the users table.
+        name (str): The name of the logger the lines are written for.
+        structured (bool): Whether to log the rows as dicts.
+        formatter (logging.Formatter): The formatter of the logger's
+        handlers, a RedactingFormatter of PII_FIELDS by default.
+
+    Returns:
+        List[str]: The formatted and redacted log line of each row.
+    """
+    if formatter is None:
+        formatter = RedactingFormatter(fields=PII_FIELDS,
+                                       structured=structured)
+    return [formatter.format(logging.LogRecord(
+        name, logging.INFO, __file__, 0,
+        row if structured else format_row(row), None, None))
+        for row in rows]
+
+
+def stream_handlers(logger: logging.Logger) -> List[logging.StreamHandler]:
+    """
+    Returns the handlers export_parallel can write formatted lines to,
+    including the ones behind its QueueListener in async mode.
+
+    Lines are formatted in the workers with a copy of the handlers'
+    formatter, which only matches what the logger would write when it
+    is configured like get_logger() does: no propagation, no filters,
+    handlers accepting INFO records and StreamHandlers sharing the
+    settings of a RedactingFormatter.
+
+    Args:
+        logger (logging.Logger): The logger receiving the lines.
+
+    Returns:
+        List[logging.StreamHandler]: The handlers of the logger, or None
+        if it isn't configured like get_logger() does.
+    """
+    if logger.propagate or logger.filters or not logger.handlers:
+        return None
+    handlers = []
+    for handler in logger.handlers:
+        listener = getattr(handler, "listener", None)
+        if isinstance(handler, QueueHandler) and listener is not None:
+            if handler.filters or handler.level > logging.INFO:
+                return None
+            handlers.extend(listener.handlers)
+        else:
+            handlers.append(handler)
+    formatter = handlers[0].formatter if handlers else None
+    for handler in handlers:
+        if handler.filters or handler.level > logging.INFO or \
+                not isinstance(handler, logging.StreamHandler) or \
+                getattr(handler, "stream", None) is None or \
+                type(handler.formatter) is not RedactingFormatter or \
+                tuple(handler.formatter.fields) != \
+                tuple(formatter.fields) or \
+                handler.formatter.structured != formatter.structured or \
+                handler.formatter.datefmt != formatter.datefmt:
+            return None
+    return handlers
+
+
+def write_lines(handlers: List[logging.StreamHandler],
+                lines: List[str]) -> None:
+    """
+    Writes already formatted lines to stream handlers.
+
+    Args:
+        handlers (List[logging.StreamHandler]): The handlers, as returned
+        by stream_handlers().
+        lines (List[str]): The formatted log lines.
+    """
+    if not lines:
+        return
+    for handler in handlers:
+        handler.acquire()
+        try:
+            handler.stream.write(
+                "".join(line + handler.terminator for line in lines))
+            handler.flush()
+        finally:
+            handler.release()
+
+
+def export_serial(cursor, logger: logging.Logger, batch_size: int,
+                  structured: bool = False) -> None:
+    """
+    Logs the rows of an executed query one by one.
+
+    Args:
+        cursor: An unbuffered cursor on which a query has been executed.
+        logger (logging.Logger): The logger receiving the rows.
+        batch_size (int): The number of rows fetched per round trip.
+        structured (bool): Whether to log the rows as dicts.
+    """
+    if structured:
+        for row in iter_rows(cursor, batch_size):
+            logger.info(row)
+    else:
+        for message in map(format_row, iter_rows(cursor, batch_size)):
+            logger.info(message)
+
+
+def export_parallel(cursor, logger: logging.Logger, batch_size: int,
+                    workers: int, structured: bool = False) -> None:
+    """
+    Redacts the rows of an executed query on a pool of worker processes.
+
+    Batches are read here, redacted by the workers and written back in
+    their original order, so the output matches the serial export.
+    At most two batches per worker are in flight at any time.
+    When the logger isn't configured like get_logger() does, see
+    stream_handlers(), rows are logged serially instead.
+
+    Args:
+        cursor: An unbuffered cursor on which a query has been executed.
+        logger (logging.Logger): The logger receiving the lines.
+        batch_size (int): The number of rows per batch.
+        workers (int): The number of worker processes.
+        structured (bool): Whether to log the rows as dicts.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    handlers = stream_handlers(logger)
+    if handlers is None:
+        export_serial(cursor, logger, batch_size, structured)
+        return
+    formatter = handlers[0].formatter if handlers else None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for rows in iter_batches(cursor, batch_size):
+            pending.append(executor.submit(redact_rows, rows, logger.name,
+                                           structured, formatter))
+            if len(pending) >= 2 * workers:
+                write_lines(handlers, pending.popleft().result())
+        while pending:
+            write_lines(handlers, pending.popleft().result())
 
 
 def main() -> None:
@@ -117,21 +784,34 @@ def main() -> None:
     4. ssn
     5. password
 
+    Rows are streamed from an unbuffered cursor in batches of
+    PERSONAL_DATA_DB_BATCH_SIZE rows, so memory stays flat whatever the
+    size of the table. Redaction is done by the logger's RedactingFormatter,
+    or by PERSONAL_DATA_WORKERS processes when it is greater than 1.
+    With PERSONAL_DATA_LOG_FORMAT set to json, rows are logged as dicts and
+    redacted by key instead of being flattened to text.
+
     Only your main function should run when the module is executed.
     """
     logger = get_logger()
     logger.setLevel(logging.INFO)
+    batch_size = int(os.getenv("PERSONAL_DATA_DB_BATCH_SIZE", "1000"))
+    workers = int(os.getenv("PERSONAL_DATA_WORKERS", "1"))
+    structured = _structured_logs()
 
     db = get_db()
-    cursor = db.cursor()
-
-    cursor.execute("SELECT * FROM users")
-    rows = cursor.fetchall()
-
-    for row in rows:
-        message = "; ".join([f"{field}={row[field]}" for field in row.keys()])
-        logger.info(filter_datum(PII_FIELDS, RedactingFormatter.REDACTION,
-                                 message, RedactingFormatter.SEPARATOR))
+    cursor = db.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute("SELECT * FROM users")
+        if workers > 1:
+            export_parallel(cursor, logger, batch_size, workers, structured)
+        else:
+            export_serial(cursor, logger, batch_size, structured)
+    finally:
+        try:
+            cursor.close()
+        finally:
+            db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Module for hashing passwords on a pool of threads.
+"""
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Iterable, List, Tuple
+
+from encrypt_password import hash_password, is_valid
+
+
+class HashingService:
+    """ Runs bcrypt hashes and checks on a pool of threads
+
+    bcrypt releases the GIL while it works, so the threads hash in
+    parallel and callers are not blocked for the ~250ms of each call.
+    """
+
+    def __init__(self, max_workers: int = None, rounds: int = 12):
+        """
+        Initialize the HashingService.
+
+        Args:
+            max_workers (int): The number of hashing threads, defaults to
+            the ThreadPoolExecutor default.
+            rounds (int): The bcrypt work factor of new hashes.
+        """
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="bcrypt")
+
+    def hash(self, password: str) -> Future:
+        """
+        Hashes a password in the background.
+
+        Args:
+            password (str): The plain text password to hash.
+
+        Returns:
+            Future: Resolves to the salted, hashed password.
+        """
+        return self._executor.submit(hash_password, password, self.rounds)
+
+    def verify(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Validates a password against its hash in the background.
+
+        Args:
+            hashed_password (bytes): The hashed password to compare against.
+            password (str): The plain text password to validate.
+
+        Returns:
+            Future: Resolves to True if the password matches the hash.
+        """
+        return self._executor.submit(is_valid, hashed_password, password)
+
+    def hash_many(self, passwords: Iterable[str]) -> List[bytes]:
+        """
+        Hashes passwords in parallel.
+
+        Args:
+            passwords (Iterable[str]): The plain text passwords to hash.
+
+        Returns:
+            List[bytes]: The hashed passwords, in the same order.
+        """
+        return list(self._executor.map(
+            partial(hash_password, rounds=self.rounds), passwords))
+
+    def verify_many(self,
+                    pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+        """
+        Validates passwords against their hashes in parallel.
+
+        Args:
+            pairs (Iterable[Tuple[bytes, str]]): (hashed_password, password)
+            pairs to validate.
+
+        Returns:
+            List[bool]: Whether each password matches, in the same order.
+        """
+        return list(self._executor.map(lambda pair: is_valid(*pair), pairs))
+
+    async def hash_async(self, password: str) -> bytes:
+        """
+        Hashes a password without blocking the event loop.
+
+        Args:
+            password (str): The plain text password to hash.
+
+        Returns:
+            bytes: The salted, hashed password.
+        """
+        return await asyncio.wrap_future(self.hash(password))
+
+    async def verify_async(self, hashed_password: bytes,
+                           password: str) -> bool:
+        """
+        Validates a password without blocking the event loop.
+
+        Args:
+            hashed_password (bytes): The hashed password to compare against.
+            password (str): The plain text password to validate.
+
+        Returns:
+            bool: True if the password matches the hash, False otherwise.
+        """
+        return await asyncio.wrap_future(self.verify(hashed_password,
+                                                     password))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the hashing threads.
+
+        Args:
+            wait (bool): Whether to wait for the pending hashes.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "HashingService":
+        """ Returns the service itself """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """ Stops the hashing threads """
+        self.shutdown()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tests of the connection pool of filtered_logger, against sqlite3 and a
+fake connector.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import filtered_logger
+from filtered_logger import ConnectionPool
+from mysql.connector.errors import PoolError
+
+
+class FakeConnection:
+    """ Connection stand-in recording how it is used """
+
+    def __init__(self, rollback_error: Exception = None):
+        """ Initialize the connection, failing rollbacks if asked to """
+        self.rollback_error = rollback_error
+        self.rollbacks = 0
+        self.closed = False
+        self.connected = True
+
+    def rollback(self) -> None:
+        """ Records a rollback, or fails it """
+        if self.rollback_error is not None:
+            raise self.rollback_error
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        """ Records the connection as closed """
+        self.closed = True
+
+    def is_connected(self) -> bool:
+        """ Returns whether the server is still reachable """
+        return self.connected
+
+
+class FakeConnector:
+    """ connect() stand-in handing out FakeConnections """
+
+    def __init__(self, **connection_options):
+        """ Initialize the connector with the options of its connections """
+        self.connection_options = connection_options
+        self.connections = []
+
+    def __call__(self, **config) -> FakeConnection:
+        """ Opens a new FakeConnection """
+        cnx = FakeConnection(**self.connection_options)
+        self.connections.append(cnx)
+        return cnx
+
+
+class TestConnectionPool(unittest.TestCase):
+    """ Tests of ConnectionPool """
+
+    def test_reuses_released_connection(self):
+        """ A released connection is handed out again """
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=2)
+        db = pool.get_connection()
+        db.close()
+        pool.get_connection().close()
+        self.assertEqual(len(connector.connections), 1)
+
+    def test_release_rolls_back(self):
+        """ Releasing a connection rolls back its transaction """
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=1)
+        pool.get_connection().close()
+        self.assertEqual(connector.connections[0].rollbacks, 1)
+
+    def test_failed_rollback_drops_connection(self):
+        """ A connection failing its rollback is closed, not reused """
+        connector = FakeConnector(rollback_error=RuntimeError("unread"))
+        pool = ConnectionPool(connector, size=1)
+        pool.get_connection().close()
+        self.assertTrue(connector.connections[0].closed)
+        pool.get_connection().close()
+        self.assertEqual(len(connector.connections), 2)
+
+    def test_unhealthy_connection_replaced(self):
+        """ A connection failing its health check is replaced """
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=1)
+        pool.get_connection().close()
+        connector.connections[0].connected = False
+        pool.get_connection().close()
+        self.assertTrue(connector.connections[0].closed)
+        self.assertEqual(len(connector.connections), 2)
+
+    def test_idle_timeout(self):
+        """ A connection idle for too long is replaced """
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=1, idle_timeout=-1)
+        pool.get_connection().close()
+        pool.get_connection().close()
+        self.assertEqual(len(connector.connections), 2)
+
+    def test_close_twice(self):
+        """ Closing a connection twice releases its slot once """
+        pool = ConnectionPool(FakeConnector(), size=1)
+        db = pool.get_connection()
+        db.close()
+        db.close()
+        with self.assertRaises(AttributeError):
+            db.rollback()
+        pool.get_connection().close()
+
+    def test_size_bounds_connections(self):
+        """ Borrowers wait once size connections are in use """
+        pool = ConnectionPool(FakeConnector(), size=1)
+        db = pool.get_connection()
+        borrowed = threading.Event()
+
+        def borrow():
+            pool.get_connection().close()
+            borrowed.set()
+
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        self.assertFalse(borrowed.wait(0.2))
+        db.close()
+        self.assertTrue(borrowed.wait(5))
+        thread.join()
+
+    def test_exhausted(self):
+        """ Borrowers get a PoolError once the timeout expires """
+        pool = ConnectionPool(FakeConnector(), size=2, timeout=0.1)
+        connections = [pool.get_connection() for _ in range(2)]
+        with self.assertRaises(PoolError):
+            pool.get_connection()
+        connections[0].close()
+        pool.get_connection().close()
+
+    def test_context_manager(self):
+        """ Leaving a with block releases the connection """
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=1, timeout=0.1)
+        with pool.get_connection() as db:
+            self.assertTrue(db.is_connected())
+        self.assertEqual(connector.connections[0].rollbacks, 1)
+        with self.assertRaises(ValueError):
+            with pool.get_connection():
+                raise ValueError("failed query")
+        pool.get_connection().close()
+
+    def test_dropped_connection_released(self):
+        """ A connection dropped without close() goes back to the pool """
+        pool = ConnectionPool(FakeConnector(), size=1, timeout=0.1)
+        pool.get_connection()
+        pool.get_connection().close()
+
+
+class TestConnectionPoolSQLite(unittest.TestCase):
+    """ Tests of ConnectionPool over sqlite3 connections """
+
+    def setUp(self):
+        """ Creates a database with a users table """
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        with sqlite3.connect(self.path) as db:
+            db.execute("CREATE TABLE users (name TEXT)")
+        self.pool = ConnectionPool(sqlite3.connect, size=1,
+                                   database=self.path)
+
+    def tearDown(self):
+        """ Removes the database """
+        db = self.pool.get_connection()
+        db._cnx.close()
+        os.remove(self.path)
+
+    def test_uncommitted_writes_discarded(self):
+        """ The next borrower doesn't continue the previous transaction """
+        db = self.pool.get_connection()
+        db.execute("INSERT INTO users VALUES ('bob')")
+        self.assertTrue(db.in_transaction)
+        db.close()
+
+        db = self.pool.get_connection()
+        self.assertFalse(db.in_transaction)
+        self.assertEqual(
+            db.execute("SELECT COUNT(*) FROM users").fetchone()[0], 0)
+        db.close()
+
+    def test_committed_writes_kept(self):
+        """ Committed writes survive the release of the connection """
+        db = self.pool.get_connection()
+        db.execute("INSERT INTO users VALUES ('bob')")
+        db.commit()
+        db.close()
+
+        db = self.pool.get_connection()
+        self.assertEqual(
+            db.execute("SELECT COUNT(*) FROM users").fetchone()[0], 1)
+        db.close()
+
+
+class TestMain(unittest.TestCase):
+    """ Tests of the connection handling of main() """
+
+    def test_failing_cursor_close_releases_connection(self):
+        """ The connection goes back to the pool when cursor.close fails """
+        cursor = mock.Mock()
+        cursor.fetchmany.return_value = []
+        cursor.close.side_effect = RuntimeError("unread result found")
+        connector = FakeConnector()
+        pool = ConnectionPool(connector, size=1)
+
+        def connection():
+            db = pool.get_connection()
+            db._cnx.cursor = mock.Mock(return_value=cursor)
+            return db
+
+        with mock.patch.object(filtered_logger, "get_db", connection):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    filtered_logger.main()
+        self.assertEqual(connector.connections[0].rollbacks, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
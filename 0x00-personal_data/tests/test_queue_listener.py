@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests of the bounded queue logging of filtered_logger.
+"""
+import logging
+import threading
+import time
+import unittest
+
+from filtered_logger import BlockingQueueListener, BoundedQueueHandler
+
+
+class SlowHandler(logging.Handler):
+    """ Handler recording the messages of its records, slowly """
+
+    def __init__(self):
+        """ Initialize with no record """
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """ Records the message after a delay """
+        time.sleep(0.001)
+        self.messages.append(record.getMessage())
+
+
+class TestBlockingQueueListener(unittest.TestCase):
+    """ Tests of BlockingQueueListener """
+
+    def test_stop_with_full_queue(self):
+        """ Stopping with a full queue writes every queued record """
+        queue_handler = BoundedQueueHandler(maxsize=5, policy="block")
+        handler = SlowHandler()
+        listener = BlockingQueueListener(queue_handler.queue, handler)
+        listener.start()
+        logger = logging.Logger("test_queue_listener")
+        logger.addHandler(queue_handler)
+        for i in range(100):
+            logger.info("line %d", i)
+        stopper = threading.Thread(target=listener.stop)
+        stopper.start()
+        stopper.join(10)
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(handler.messages,
+                         ["line {}".format(i) for i in range(100)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests of the JSON lines of RedactingFormatter.
+"""
+import json
+import logging
+import sys
+import unittest
+
+from filtered_logger import PII_FIELDS, RedactingFormatter
+
+
+def make_record(msg, exc_info=None, stack_info=None) -> logging.LogRecord:
+    """ Returns an ERROR record of the user_data logger """
+    return logging.LogRecord("user_data", logging.ERROR, __file__, 0, msg,
+                             None, exc_info, sinfo=stack_info)
+
+
+class TestStructured(unittest.TestCase):
+    """ Tests of RedactingFormatter.format_structured """
+
+    def setUp(self):
+        """ Creates a JSON formatter of the PII fields """
+        self.formatter = RedactingFormatter(PII_FIELDS, structured=True)
+
+    def test_exception(self):
+        """ The traceback is kept under exception, redacted """
+        try:
+            raise ValueError("bad email=bob@x.com;")
+        except ValueError:
+            record = make_record("boom email=a@b.c;", sys.exc_info())
+        line = json.loads(self.formatter.format(record))
+        self.assertEqual(line["message"], {"text": "boom email=***;"})
+        self.assertTrue(line["exception"].startswith("Traceback"))
+        self.assertIn("ValueError: bad email=***;", line["exception"])
+        self.assertNotIn("bob@x.com", line["exception"])
+
+    def test_stack(self):
+        """ The stack is kept under stack, redacted """
+        record = make_record({"name": "bob"},
+                             stack_info="Stack:\n  f(ssn=123;)")
+        line = json.loads(self.formatter.format(record))
+        self.assertEqual(line["message"], {"name": "***"})
+        self.assertEqual(line["stack"], "Stack:\n  f(ssn=***;)")
+
+    def test_plain(self):
+        """ Records without traceback nor stack have neither key """
+        line = json.loads(self.formatter.format(make_record("hello")))
+        self.assertNotIn("exception", line)
+        self.assertNotIn("stack", line)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ from os import getenv
 from api.v1.views import app_views
 from flask import Flask, jsonify, abort, request
 from flask_cors import CORS
-from api.v1.auth.auth import Auth
+from api.v1.auth.auth import Auth, ExclusionMatcher
 from api.v1.auth.basic_auth import BasicAuth
 
 
@@ -22,6 +22,9 @@ if auth_type == "auth":
 elif auth_type == "basic_auth":
     auth = BasicAuth()
 
+excluded_paths = ExclusionMatcher(['/api/v1/status/', '/api/v1/unauthorized/',
+                                   '/api/v1/forbidden/'])
+
 
 @app.errorhandler(401)
 def unauthorized_error(error) -> str:
@@ -41,9 +44,6 @@ def before_request_handler():
     if auth is None:
         return
 
-    excluded_paths = ['/api/v1/status/', '/api/v1/unauthorized/',
-                      '/api/v1/forbidden/']
-
     if not auth.require_auth(request.path, excluded_paths):
         return
 
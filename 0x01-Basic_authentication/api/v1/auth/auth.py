@@ -1,23 +1,97 @@
 #!/usr/bin/env python3
 """ Module for API authentication management """
 from flask import request
-from typing import List, TypeVar
+from functools import lru_cache
+from typing import List, Tuple, TypeVar, Union
+
+
+class ExclusionMatcher:
+    """
+    Matcher of the paths excluded from authentication.
+
+    Paths ending with '*' exclude every path starting with what precedes
+    it and are kept in a prefix trie, the others are slash tolerant exact
+    paths kept in a frozenset.
+    """
+
+    def __init__(self, excluded_paths: List[str]):
+        """
+        Compiles the excluded paths.
+
+        Args:
+            excluded_paths (List[str]): Exact paths and '*' prefix rules.
+        """
+        exact = set()
+        self._trie = {}
+        for excluded_path in excluded_paths:
+            if excluded_path.endswith('*'):
+                node = self._trie
+                for char in excluded_path[:-1]:
+                    node = node.setdefault(char, {})
+                node[None] = True
+            elif excluded_path.endswith('/'):
+                exact.add(excluded_path)
+            else:
+                exact.add(excluded_path + '/')
+        self._exact = frozenset(exact)
+
+    def __bool__(self) -> bool:
+        """
+        Returns whether any path is excluded.
+        """
+        return bool(self._exact or self._trie)
+
+    def matches(self, path: str) -> bool:
+        """
+        Returns whether a path ending with '/' is excluded.
+        """
+        if path in self._exact:
+            return True
+        node = self._trie
+        for char in path:
+            if None in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return None in node
+
+
+@lru_cache(maxsize=128)
+def compile_exclusions(excluded_paths: Tuple[str, ...]) -> ExclusionMatcher:
+    """
+    Returns the matcher of excluded paths, compiled once per tuple.
+    """
+    return ExclusionMatcher(excluded_paths)
 
 
 class Auth:
     """Auth class to manage API authentication."""
 
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], ExclusionMatcher]
+                     ) -> bool:
         """
         Determines if authentication is required for a given path.
+
+        Args:
+            path (str): The path of the request.
+            excluded_paths: The paths not requiring authentication, as a
+            list of exact paths and '*' prefix rules or compiled in an
+            ExclusionMatcher.
+
+        Returns:
+            bool: False if the path is excluded, True otherwise.
         """
         if path is None:
             return True
         if not excluded_paths:
             return True
+        if not isinstance(excluded_paths, ExclusionMatcher):
+            excluded_paths = compile_exclusions(tuple(excluded_paths))
         if not path.endswith('/'):
             path += '/'
-        return path not in excluded_paths
+        return not excluded_paths.matches(path)
 
     def authorization_header(self, request=None) -> str:
         """
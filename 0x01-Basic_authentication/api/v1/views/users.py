@@ -2,18 +2,132 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from bisect import bisect_right
+from flask import Response, abort, jsonify, request
+from functools import partial
+from typing import Callable, Iterable, Iterator, List
+from models.base import TIMESTAMP_FORMAT, parse_timestamp
 from models.user import User
+import json
+
+
+STREAM_PAGE_SIZE = 1000
+FILTER_ATTRIBUTES = ('email', 'first_name', 'last_name')
+
+
+def _encode_fields(user: User, fields: List[str]) -> bytes:
+    """ JSON of only the requested attributes of a user
+    """
+    user_json = user.to_json()
+    return json.dumps({key: user_json[key] for key in fields
+                       if key in user_json},
+                      sort_keys=True, separators=(",", ":")).encode()
+
+
+def _encode_users(users: Iterable[User],
+                  encode: Callable[[User], bytes]) -> bytes:
+    """ JSON list of users, joined from their encodings
+    """
+    return b"[" + b",".join(encode(user) for user in users) + b"]\n"
+
+
+def _filtered_pager(users: Iterable[User]) -> Callable:
+    """ Keyset pager like User.page over a list of users
+    """
+    users = sorted(users, key=lambda user: user.id)
+    ids = [user.id for user in users]
+
+    def page(after: str = None, limit: int = 100) -> List[User]:
+        """ Up to limit users after the ID after
+        """
+        start = 0 if after is None else bisect_right(ids, after)
+        return users[start:start + limit]
+
+    return page
+
+
+def _stream_users(page: Callable, encode: Callable[[User], bytes],
+                  after: str = None, limit: int = None) -> Iterator[bytes]:
+    """ JSON list of users ordered by ID, yielded page by page
+    """
+    yield b"["
+    separator = b""
+    while limit is None or limit > 0:
+        size = STREAM_PAGE_SIZE if limit is None else \
+            min(limit, STREAM_PAGE_SIZE)
+        users = page(after, size)
+        for user in users:
+            yield separator + encode(user)
+            separator = b","
+        if len(users) < size:
+            break
+        after = users[-1].id
+        if limit is not None:
+            limit -= size
+    yield b"]\n"
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters:
+      - email, first_name, last_name (optional): exact match filters
+      - created_at_min, created_at_max (optional): inclusive bounds of
+        created_at, formatted like it
+      - fields (optional): comma separated attributes to return
+      - limit (optional): maximum number of users, ordered by ID
+      - after (optional): ID of the last user of the previous page
+      - stream (optional): 1 to stream the list in chunks
     Return:
-      - list of all User objects JSON represented
+      - list of all matching User objects JSON represented
+      - with limit, the X-Next-Cursor header holds the `after` value
+        of the next page when there is one
+      - 400 if limit isn't a positive integer or a created_at bound
+        isn't a valid date
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    after = request.args.get('after')
+    limit = request.args.get('limit')
+    stream = request.args.get('stream') == "1"
+    if limit is not None:
+        if not (limit.isascii() and limit.isdecimal()) or int(limit) == 0:
+            return jsonify({'error': "limit must be a positive integer"}), 400
+        limit = int(limit)
+    created_min = request.args.get('created_at_min')
+    created_max = request.args.get('created_at_max')
+    try:
+        created_min = parse_timestamp(created_min) if created_min else None
+        created_max = parse_timestamp(created_max) if created_max else None
+    except ValueError:
+        return jsonify({'error': "created_at bounds must match {}".format(
+            TIMESTAMP_FORMAT)}), 400
+    encode = User.to_json_bytes
+    if request.args.get('fields'):
+        encode = partial(_encode_fields,
+                         fields=request.args['fields'].split(','))
+
+    page = User.page
+    filters = {key: request.args[key] for key in FILTER_ATTRIBUTES
+               if key in request.args}
+    users = None
+    if filters or created_min or created_max:
+        users = [user for user in User.search(filters)
+                 if (created_min is None or user.created_at >= created_min)
+                 and (created_max is None or user.created_at <= created_max)]
+        page = _filtered_pager(users)
+
+    if stream:
+        return Response(_stream_users(page, encode, after, limit),
+                        mimetype="application/json")
+    if limit is None and after is None:
+        return Response(_encode_users(
+            User.all() if users is None else users, encode),
+            mimetype="application/json")
+    users = page(after, limit if limit is not None else User.count())
+    response = Response(_encode_users(users, encode),
+                        mimetype="application/json")
+    if limit is not None and len(users) == limit:
+        response.headers['X-Next-Cursor'] = users[-1].id
+    return response
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -1,21 +1,294 @@
 #!/usr/bin/env python3
 """ Base module
 """
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
+from typing import TypeVar, List, Iterable, Dict, Iterator, Tuple
+from os import getenv, path
+import atexit
 import json
+import mmap
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
 import uuid
 
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
+INDEXES = {}
+JOURNAL_LENGTHS = {}
+ORDERED_IDS = {}
+SLOT_NAMES = {}
+PENDING = {}
+LOCK = threading.RLock()
+SNAPSHOT_LINE = re.compile(rb'"([^"\\\n]*)": (\{[^\n]*\}),?\n')
+_flush_state = {'batch_depth': 0, 'flusher': None}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ Parse a TIMESTAMP_FORMAT string, like datetime.strptime
+    Strings with exactly that layout go through datetime.fromisoformat,
+    which is much faster
+    """
+    if len(value) == 19 and value[4] == '-' and value[7] == '-' and \
+            value[10] == 'T' and value[13] == ':' and value[16] == ':' and \
+            value.isascii():
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+def format_timestamp(value: datetime) -> str:
+    """ Format a datetime with TIMESTAMP_FORMAT, like datetime.strftime
+    Naive datetimes go through datetime.isoformat, which is faster
+    """
+    if value.tzinfo is None and value.year >= 1000:
+        return value.isoformat(timespec='seconds')
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+class Index():
+    """ Secondary hash index of object IDs by the value of one attribute
+    """
+
+    def __init__(self, attribute: str):
+        """ Initialize an empty index on attribute
+        """
+        self.attribute = attribute
+        self.ids = {}
+        self.values = {}
+
+    def add(self, obj: TypeVar('Base')):
+        """ Index obj, or refresh it if it is already indexed
+        """
+        self.set(obj.id, getattr(obj, self.attribute, None))
+
+    def set(self, obj_id: str, value):
+        """ Index the object with the ID obj_id under value
+        """
+        if obj_id in self.values and self.values[obj_id] == value:
+            return
+        self.discard(obj_id)
+        try:
+            self.ids.setdefault(value, {})[obj_id] = None
+        except TypeError:
+            return
+        self.values[obj_id] = value
+
+    def discard(self, obj_id: str):
+        """ Remove the object with the ID obj_id from the index
+        """
+        if obj_id not in self.values:
+            return
+        value = self.values.pop(obj_id)
+        del self.ids[value][obj_id]
+        if not self.ids[value]:
+            del self.ids[value]
+
+    def find(self, value) -> Iterable[str]:
+        """ Return the IDs of all indexed objects with this value
+        Raises TypeError if value can't be indexed
+        """
+        return self.ids.get(value, {}).keys()
+
+
+class LazyObjects(MutableMapping):
+    """ Objects of a class indexed by ID over a memory-mapped snapshot
+
+    The file is only scanned for the position of each object the first
+    time the store is accessed, and each object is only built from its
+    line the first time it is accessed, or by materialize_all().
+    """
+
+    def __init__(self, cls: type, buffer: mmap.mmap):
+        """ Initialize the store over the snapshot mapped in buffer
+        """
+        self._cls = cls
+        self._buffer = buffer
+        self._entries = None
+        self._unloaded = 0
+
+    def _scan(self) -> Dict[str, object]:
+        """ Return the objects, or (start, end) offsets of the ones not
+        built yet, by ID, scanning the file on first use
+        A file which isn't line-based is loaded at once instead
+        """
+        if self._entries is not None:
+            return self._entries
+        with LOCK:
+            if self._entries is None:
+                try:
+                    entries = self.offsets(self._buffer)
+                except ValueError:
+                    entries = {obj_id: self._cls(**obj_json)
+                               for obj_id, obj_json in
+                               json.loads(self._buffer[:]).items()}
+                self._unloaded = sum(type(entry) is tuple
+                                     for entry in entries.values())
+                if self._unloaded == 0:
+                    self._buffer.close()
+                self._entries = entries
+        return self._entries
+
+    def __getitem__(self, obj_id: str) -> TypeVar('Base'):
+        """ Return an object, building it on first access
+        """
+        entry = self._scan()[obj_id]
+        if type(entry) is not tuple:
+            return entry
+        with LOCK:
+            entry = self._entries[obj_id]
+            if type(entry) is tuple:
+                start, end = entry
+                entry = self._cls(**json.loads(self._buffer[start:end]))
+                self._entries[obj_id] = entry
+                self._loaded()
+        return entry
+
+    def __setitem__(self, obj_id: str, obj: TypeVar('Base')):
+        """ Store an object
+        """
+        with LOCK:
+            if type(self._scan().get(obj_id)) is tuple:
+                self._loaded()
+            self._entries[obj_id] = obj
+
+    def __delitem__(self, obj_id: str):
+        """ Remove an object
+        """
+        with LOCK:
+            if type(self._scan()[obj_id]) is tuple:
+                self._loaded()
+            del self._entries[obj_id]
+
+    def __iter__(self) -> Iterator[str]:
+        """ Iterate over the IDs, in file order
+        """
+        return iter(self._scan())
+
+    def __len__(self) -> int:
+        """ Number of objects, built or not
+        """
+        return len(self._scan())
+
+    def _loaded(self):
+        """ Count one less object to build, and release the file
+        once they are all built
+        """
+        self._unloaded -= 1
+        if self._unloaded == 0:
+            self._buffer.close()
+
+    def values_of(self, attribute: str) -> Iterator[Tuple[str, object]]:
+        """ Iterate over the ID and attribute value of each object,
+        read from its line of the file when it isn't built yet
+        """
+        for obj_id, entry in list(self._scan().items()):
+            if type(entry) is tuple:
+                start, end = entry
+                yield obj_id, json.loads(
+                    self._buffer[start:end]).get(attribute)
+            else:
+                yield obj_id, getattr(entry, attribute, None)
+
+    def materialize_all(self):
+        """ Build every object not accessed yet
+        """
+        for obj_id in list(self._scan()):
+            try:
+                self[obj_id]
+            except KeyError:
+                pass
+
+    @staticmethod
+    def offsets(buffer: mmap.mmap) -> Dict[str, tuple]:
+        """ Return the (start, end) offsets of each object of a snapshot
+        written by save_to_file, one object per line
+        Lines are matched by SNAPSHOT_LINE rather than parsed, and
+        raise ValueError for any other layout, or IDs with escapes
+        """
+        offsets = {}
+        if buffer[:2] != b"{\n":
+            raise ValueError("not a line-based snapshot")
+        position = 2
+        for match in SNAPSHOT_LINE.finditer(buffer, position):
+            if match.start() != position:
+                raise ValueError("not a line-based snapshot")
+            offsets[match[1].decode()] = match.span(2)
+            position = match.end()
+        if buffer[position:].rstrip(b"\n") != b"}":
+            raise ValueError("not a line-based snapshot")
+        return offsets
+
+
+def _start_flusher(interval_ms: float):
+    """ Start the background thread flushing pending changes, once
+    """
+    with LOCK:
+        if _flush_state['flusher'] is not None:
+            return
+
+        def _flush_periodically():
+            while True:
+                time.sleep(interval_ms / 1000)
+                if _flush_state['batch_depth'] == 0:
+                    Base.flush_all()
+
+        _flush_state['flusher'] = threading.Thread(
+            target=_flush_periodically, name="models-flusher", daemon=True)
+        _flush_state['flusher'].start()
 
 
 class Base():
     """ Base class
+
+    Attributes listed in INDEXED_ATTRIBUTES are indexed by value, which
+    search uses instead of a full scan. Each index is built by the first
+    search() on its attribute and refreshed on save().
+
+    With STORAGE set to "journal", save() and remove() append one record
+    to .db_<class>.journal instead of rewriting .db_<class>.json, which
+    is compacted once the journal holds JOURNAL_COMPACT_EVERY records.
+    Otherwise every write compacts, emptying a journal left over from
+    journal mode so that it isn't replayed over newer snapshots.
+
+    With LAZY_LOAD set, load_from_file() only maps the file. It is scanned
+    for the position of each object on first access, and each object is
+    built on its own first access. Indexes are then built from the file,
+    so INDEXED_ATTRIBUTES must be stored there as they are on the
+    objects, and search() only builds the objects it returns.
+    With WARM_CACHE also set, a background thread then builds them all.
+
+    Changes are written to file once FLUSH_EVERY of them are pending
+    (1 writes each change immediately, 0 disables it), every
+    FLUSH_INTERVAL_MS milliseconds by a background thread when it is set,
+    at the end of a `with Base.batch():` block and at interpreter exit.
+
+    Subclasses declaring __slots__ for all their attributes get compact
+    instances without a __dict__, see User.
+
+    to_json() and to_json_bytes() results are cached on the object until
+    one of its attributes is set again, which save() does.
     """
 
+    __slots__ = ('id', 'created_at', 'updated_at', '_json_cache')
+    INDEXED_ATTRIBUTES = ()
+    STORAGE = getenv("MODELS_STORAGE", "snapshot")
+    JOURNAL_COMPACT_EVERY = int(getenv("MODELS_JOURNAL_COMPACT_EVERY",
+                                       "1000"))
+    FLUSH_EVERY = int(getenv("MODELS_FLUSH_EVERY", "1"))
+    FLUSH_INTERVAL_MS = float(getenv("MODELS_FLUSH_INTERVAL_MS", "0"))
+    LAZY_LOAD = getenv("MODELS_LAZY_LOAD", "0") == "1"
+    WARM_CACHE = getenv("MODELS_WARM_CACHE", "0") == "1"
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
@@ -25,16 +298,21 @@ class Base():
 
         self.id = kwargs.get('id', str(uuid.uuid4()))
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self.created_at = parse_timestamp(kwargs.get('created_at'))
         else:
             self.created_at = datetime.utcnow()
         if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+            self.updated_at = parse_timestamp(kwargs.get('updated_at'))
         else:
             self.updated_at = datetime.utcnow()
 
+    def __setattr__(self, name: str, value):
+        """ Set an attribute and drop the cached JSON
+        """
+        object.__setattr__(self, name, value)
+        if name != '_json_cache':
+            object.__setattr__(self, '_json_cache', None)
+
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
         """
@@ -44,18 +322,67 @@ class Base():
             return False
         return (self.id == other.id)
 
+    @classmethod
+    def _slot_names(cls) -> Tuple[str, ...]:
+        """ Return the slots of the class and its parents, base first
+        """
+        names = SLOT_NAMES.get(cls)
+        if names is None:
+            names = tuple(name for klass in reversed(cls.__mro__)
+                          for name in klass.__dict__.get('__slots__', ())
+                          if name not in ('__dict__', '__weakref__',
+                                          '_json_cache'))
+            SLOT_NAMES[cls] = names
+        return names
+
+    def _attributes(self) -> Iterator[Tuple[str, object]]:
+        """ Iterate over the attributes set on the object, from its
+        slots then its __dict__ if it has one
+        """
+        for name in self._slot_names():
+            try:
+                yield name, getattr(self, name)
+            except AttributeError:
+                pass
+        if hasattr(self, '__dict__'):
+            yield from self.__dict__.items()
+
+    def _json_cached(self) -> dict:
+        """ Return the cache of serialized forms of the object
+        """
+        cache = getattr(self, '_json_cache', None)
+        if cache is None:
+            cache = {}
+            self._json_cache = cache
+        return cache
+
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
         """
-        result = {}
-        for key, value in self.__dict__.items():
-            if not for_serialization and key[0] == '_':
-                continue
-            if type(value) is datetime:
-                result[key] = value.strftime(TIMESTAMP_FORMAT)
-            else:
-                result[key] = value
-        return result
+        cache = self._json_cached()
+        result = cache.get(for_serialization)
+        if result is None:
+            result = {}
+            for key, value in self._attributes():
+                if not for_serialization and key[0] == '_':
+                    continue
+                if type(value) is datetime:
+                    result[key] = format_timestamp(value)
+                else:
+                    result[key] = value
+            cache[for_serialization] = result
+        return dict(result)
+
+    def to_json_bytes(self) -> bytes:
+        """ Return to_json() encoded like flask.jsonify does
+        """
+        cache = self._json_cached()
+        encoded = cache.get('bytes')
+        if encoded is None:
+            encoded = json.dumps(self.to_json(), sort_keys=True,
+                                 separators=(",", ":")).encode()
+            cache['bytes'] = encoded
+        return encoded
 
     @classmethod
     def load_from_file(cls):
@@ -64,42 +391,223 @@ class Base():
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
         DATA[s_class] = {}
-        if not path.exists(file_path):
+        INDEXES[s_class] = {}
+        ORDERED_IDS.pop(s_class, None)
+        if path.exists(file_path) and not (cls.LAZY_LOAD and
+                                           cls._map_file(file_path)):
+            with open(file_path, 'r') as f:
+                objs_json = json.load(f)
+                for obj_id, obj_json in objs_json.items():
+                    DATA[s_class][obj_id] = cls(**obj_json)
+        cls._replay_journal()
+        if type(DATA[s_class]) is LazyObjects and cls.WARM_CACHE:
+            cls.warm_cache()
+
+    @classmethod
+    def _map_file(cls, file_path: str) -> bool:
+        """ Map a snapshot, whose objects are found and built on access
+        Return False if the file can't be loaded lazily
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:2] != b"{\n":
+            buffer.close()
+            return False
+        DATA[cls.__name__] = LazyObjects(cls, buffer)
+        return True
+
+    @classmethod
+    def warm_cache(cls, background: bool = True):
+        """ Build all objects loaded lazily, in a background thread
+        unless background is False
+        """
+        objs = DATA.get(cls.__name__)
+        if type(objs) is not LazyObjects:
             return
+        if not background:
+            objs.materialize_all()
+            return
+        threading.Thread(target=objs.materialize_all,
+                         name="models-warm-cache", daemon=True).start()
+
+    @classmethod
+    def _replay_journal(cls):
+        """ Apply the journal records on top of the loaded snapshot
+        A torn or malformed record, as left by a crash, ends the replay
+        and is truncated with the records after it
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        JOURNAL_LENGTHS[s_class] = 0
+        if not path.exists(journal_path):
+            return
+
+        offset = 0
+        with open(journal_path, 'rb+') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("torn record")
+                    op, obj_id, obj = cls._parse_record(json.loads(line))
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    f.truncate(offset)
+                    break
+                if op == 'save':
+                    DATA[s_class][obj_id] = obj
+                else:
+                    DATA[s_class].pop(obj_id, None)
+                JOURNAL_LENGTHS[s_class] += 1
+                offset += len(line)
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+    @classmethod
+    def _parse_record(cls, record: dict) -> tuple:
+        """ Return the operation, object ID and object, for a save, of
+        a journal record, or raise ValueError if it is malformed
+        """
+        if not isinstance(record, dict) or \
+                record.get('op') not in ('save', 'remove') or \
+                not isinstance(record.get('id'), str):
+            raise ValueError("malformed record")
+        if record['op'] == 'remove':
+            return 'remove', record['id'], None
+        if not isinstance(record.get('obj'), dict):
+            raise ValueError("malformed record")
+        return 'save', record['id'], cls(**record['obj'])
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
+        Objects are streamed one per line to a temporary file, which is
+        synced then atomically renamed over the previous one
         """
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
+        mode = 0o644
+        if path.exists(file_path):
+            mode = stat.S_IMODE(os.stat(file_path).st_mode)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=file_path + ".", dir=path.dirname(path.abspath(file_path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write("{")
+                separator = "\n"
+                for obj_id, obj in DATA[s_class].items():
+                    f.write(separator + json.dumps(obj_id) + ": " +
+                            json.dumps(obj.to_json(True)))
+                    separator = ",\n"
+                f.write("\n}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+    @classmethod
+    def compact(cls):
+        """ Save all objects to file and empty the journal, if any, whose
+        records the new snapshot already holds
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        with LOCK:
+            PENDING.pop(cls, None)
+            cls.save_to_file()
+            if cls.STORAGE == "journal" or path.exists(journal_path):
+                open(journal_path, 'w').close()
+            JOURNAL_LENGTHS[s_class] = 0
+
+    @classmethod
+    def _persist(cls, op: str, obj: TypeVar('Base')):
+        """ Record the save or removal of obj, and flush it to file
+        according to the flush policy
+        """
+        record = {'op': op, 'id': obj.id}
+        if op == 'save' and cls.STORAGE == "journal":
+            record['obj'] = obj.to_json(True)
+        pending = PENDING.setdefault(cls, [])
+        pending.append(record)
+        if _flush_state['batch_depth'] > 0:
+            return
+        if cls.FLUSH_EVERY > 0 and len(pending) >= cls.FLUSH_EVERY:
+            cls.flush()
+        elif cls.FLUSH_INTERVAL_MS > 0:
+            _start_flusher(cls.FLUSH_INTERVAL_MS)
+
+    @classmethod
+    def flush(cls):
+        """ Write the pending changes of the class to file
+        """
+        s_class = cls.__name__
+        with LOCK:
+            pending = PENDING.pop(cls, None)
+            if not pending:
+                return
+            if cls.STORAGE != "journal":
+                cls.compact()
+                return
+
+            with open(".db_{}.journal".format(s_class), 'a') as f:
+                f.write("".join(json.dumps(record) + "\n"
+                                for record in pending))
+            JOURNAL_LENGTHS[s_class] = \
+                JOURNAL_LENGTHS.get(s_class, 0) + len(pending)
+            if JOURNAL_LENGTHS[s_class] >= cls.JOURNAL_COMPACT_EVERY:
+                cls.compact()
+
+    @staticmethod
+    def flush_all():
+        """ Write the pending changes of every class to file
+        """
+        with LOCK:
+            for cls in list(PENDING):
+                cls.flush()
+
+    @staticmethod
+    @contextmanager
+    def batch() -> Iterator[None]:
+        """ Defer the writes of the block to one flush at its end
+        """
+        with LOCK:
+            _flush_state['batch_depth'] += 1
+        try:
+            yield
+        finally:
+            with LOCK:
+                _flush_state['batch_depth'] -= 1
+                if _flush_state['batch_depth'] == 0:
+                    Base.flush_all()
 
     def save(self):
         """ Save current object
         """
         s_class = self.__class__.__name__
         self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        with LOCK:
+            if s_class in ORDERED_IDS and self.id not in DATA[s_class]:
+                insort(ORDERED_IDS[s_class], self.id)
+            DATA[s_class][self.id] = self
+            for index in INDEXES.get(s_class, {}).values():
+                index.add(self)
+            self.__class__._persist('save', self)
 
     def remove(self):
         """ Remove object
         """
         s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        with LOCK:
+            if DATA[s_class].get(self.id) is not None:
+                del DATA[s_class][self.id]
+                if s_class in ORDERED_IDS:
+                    ids = ORDERED_IDS[s_class]
+                    del ids[bisect_left(ids, self.id)]
+                for index in INDEXES.get(s_class, {}).values():
+                    index.discard(self.id)
+                self.__class__._persist('remove', self)
 
     @classmethod
     def count(cls) -> int:
@@ -114,6 +622,21 @@ class Base():
         """
         return cls.search()
 
+    @classmethod
+    def page(cls, after: str = None,
+             limit: int = 100) -> List[TypeVar('Base')]:
+        """ Return up to limit objects ordered by ID, starting after
+        the ID after (keyset pagination)
+        """
+        s_class = cls.__name__
+        with LOCK:
+            if s_class not in ORDERED_IDS:
+                ORDERED_IDS[s_class] = sorted(DATA[s_class])
+            ids = ORDERED_IDS[s_class]
+            start = 0 if after is None else bisect_right(ids, after)
+            return [DATA[s_class][obj_id]
+                    for obj_id in ids[start:start + limit]]
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
@@ -121,9 +644,35 @@ class Base():
         s_class = cls.__name__
         return DATA[s_class].get(id)
 
+    @classmethod
+    def _indexes(cls, attributes: Iterable[str] = None) -> Dict[str, Index]:
+        """ Return the indexes of the class by attribute, building
+        the missing ones among attributes, all of them by default
+        """
+        s_class = cls.__name__
+        with LOCK:
+            if INDEXES.get(s_class) is None:
+                INDEXES[s_class] = {}
+            indexes = INDEXES[s_class]
+            for attribute in cls.INDEXED_ATTRIBUTES:
+                if attribute not in indexes and \
+                        (attributes is None or attribute in attributes):
+                    index = Index(attribute)
+                    objs = DATA.get(s_class, {})
+                    if type(objs) is LazyObjects:
+                        for obj_id, value in objs.values_of(attribute):
+                            index.set(obj_id, value)
+                    else:
+                        for obj in objs.values():
+                            index.add(obj)
+                    indexes[attribute] = index
+        return indexes
+
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+        Only candidates from an index are scanned when one covers
+        an attribute of the query
         """
         s_class = cls.__name__
         def _search(obj):
@@ -133,5 +682,18 @@ class Base():
                 if (getattr(obj, k) != v):
                     return False
             return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+
+        objs = DATA[s_class].values()
+        indexes = cls._indexes(attributes)
+        for k, v in attributes.items():
+            if k in indexes:
+                try:
+                    objs = [DATA[s_class][obj_id]
+                            for obj_id in indexes[k].find(v)]
+                    break
+                except TypeError:
+                    pass
+        return list(filter(_search, objs))
+
+
+atexit.register(Base.flush_all)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+""" Tests of the file storage of models.base, in a temporary directory
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from models import base
+from models.user import User
+
+
+class StorageTests(unittest.TestCase):
+    """ Run each test in an empty temporary directory """
+
+    def setUp(self):
+        """ Move to an empty directory and reset the stored objects """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        for patch in (mock.patch.dict(base.DATA, clear=True),
+                      mock.patch.dict(base.INDEXES, clear=True),
+                      mock.patch.dict(base.JOURNAL_LENGTHS, clear=True),
+                      mock.patch.dict(base.ORDERED_IDS, clear=True),
+                      mock.patch.dict(base.PENDING, clear=True)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def storage(self, mode: str):
+        """ Switch User to a storage mode """
+        patch = mock.patch.object(User, 'STORAGE', mode)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+
+class TestJournal(StorageTests):
+    """ Tests of the journal storage """
+
+    def test_replay(self):
+        """ Journaled saves and removals are replayed on load """
+        self.storage("journal")
+        User.load_from_file()
+        kept, removed = User(email="a@x"), User(email="b@x")
+        kept.save()
+        removed.save()
+        removed.remove()
+        User.load_from_file()
+        self.assertEqual([u.email for u in User.all()], ["a@x"])
+
+    def test_leftover_journal(self):
+        """ A journal left over from journal mode isn't replayed over
+        snapshots written later
+        """
+        self.storage("journal")
+        User.load_from_file()
+        User(email="old@x").save()
+
+        self.storage("snapshot")
+        User.load_from_file()
+        user = User.all()[0]
+        user.email = "new@x"
+        user.save()
+
+        User.load_from_file()
+        self.assertEqual([u.email for u in User.all()], ["new@x"])
+        self.assertEqual(len(User.search({"email": "new@x"})), 1)
+        self.assertEqual(os.path.getsize(".db_User.journal"), 0)
+
+    def test_snapshot_without_journal(self):
+        """ Snapshot mode doesn't create a journal """
+        self.storage("snapshot")
+        User.load_from_file()
+        User(email="a@x").save()
+        self.assertFalse(os.path.exists(".db_User.journal"))
+
+
+class TestLazyLoad(StorageTests):
+    """ Tests of the lazy loading of snapshots """
+
+    def setUp(self):
+        """ Save a few users then switch to lazy loading """
+        super().setUp()
+        self.storage("snapshot")
+        User.load_from_file()
+        with User.batch():
+            for i in range(5):
+                User(email="user{}@x".format(i)).save()
+        patch = mock.patch.object(User, 'LAZY_LOAD', True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_startup_maps_only(self):
+        """ Loading neither scans the file nor builds the indexes """
+        User.load_from_file()
+        self.assertIsInstance(base.DATA["User"], base.LazyObjects)
+        self.assertIsNone(base.DATA["User"]._entries)
+        self.assertEqual(base.INDEXES["User"], {})
+
+    def test_search_builds_matches_only(self):
+        """ An indexed search only builds the objects it returns """
+        User.load_from_file()
+        users = User.search({"email": "user3@x"})
+        self.assertEqual([u.email for u in users], ["user3@x"])
+        self.assertEqual(base.DATA["User"]._unloaded, 4)
+        self.assertEqual(User.count(), 5)
+
+    def test_not_line_based(self):
+        """ Snapshots in another layout are loaded at once """
+        with open(".db_User.json") as f:
+            objs = json.load(f)
+        with open(".db_User.json", "w") as f:
+            json.dump(objs, f, indent=2)
+        User.load_from_file()
+        self.assertEqual(User.count(), 5)
+        self.assertEqual(len(User.search({"email": "user3@x"})), 1)
+
+    def test_escaped_ids(self):
+        """ IDs with escapes are loaded like the others """
+        User(id='a"b', email="quoted@x").save()
+        User.load_from_file()
+        self.assertEqual(User.get('a"b').email, "quoted@x")
+        self.assertEqual(User.count(), 6)
+
+    def test_journal_replayed(self):
+        """ The journal is replayed over the mapped snapshot """
+        self.storage("journal")
+        User.load_from_file()
+        user = User.search({"email": "user1@x"})[0]
+        user.email = "new@x"
+        user.save()
+        User.load_from_file()
+        self.assertEqual(len(User.search({"email": "new@x"})), 1)
+        self.assertEqual(User.search({"email": "user1@x"}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@
 Route module for the API
 """
 from os import getenv
-from api.v1.auth.auth import Auth
+from api.v1.auth.auth import Auth, ExclusionMatcher
 from api.v1.views import app_views
 from flask import Flask, jsonify, abort, request
 from flask_cors import CORS
@@ -21,29 +21,32 @@ if auth_type == "basic_auth":
 elif auth_type == "session_auth":
     from api.v1.auth.session_auth import SessionAuth
     auth = SessionAuth()
+elif auth_type == "signed_session_auth":
+    from api.v1.auth.signed_session_auth import SignedSessionAuth
+    auth = SignedSessionAuth()
 else:
     auth = Auth()
 
+excluded_paths = ExclusionMatcher(['/api/v1/status/',
+                                   '/api/v1/unauthorized/',
+                                   '/api/v1/forbidden/',
+                                   '/api/v1/auth_session/login/'])
+
 
 @app.before_request
 def filter_auth_require() -> None:
     """
     filters requests that need authorization
     """
-    require_auth = auth.require_auth(request.path,
-                                     ['/api/v1/status/',
-                                      '/api/v1/unauthorized/',
-                                      '/api/v1/forbidden/',
-                                      '/api/v1/auth_session/login/'])
+    require_auth = auth.require_auth(request.path, excluded_paths)
     if not require_auth:
         return None
-    if not auth.authorization_header(
-            request) and not auth.session_cookie(request):
+    context = auth.request_context(request)
+    if not context.authorization and not context.session_id:
         abort(401)
-    usr = auth.current_user(request)
-    if not usr:
+    if not context.user:
         abort(403)
-    request.current_user = usr
+    request.current_user = context.user
 
 
 @app.errorhandler(404)
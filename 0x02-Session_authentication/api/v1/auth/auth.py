@@ -1,24 +1,146 @@
 #!/usr/bin/env python3
 """ Module for API authentication management """
-from flask import request
-from typing import List, TypeVar
+from flask import g, has_request_context, request
+from functools import lru_cache
+from typing import List, Tuple, TypeVar, Union
 import os
 
 
+class ExclusionMatcher:
+    """
+    Matcher of the paths excluded from authentication.
+
+    Paths ending with '*' exclude every path starting with what precedes
+    it and are kept in a prefix trie, the others are slash tolerant exact
+    paths kept in a frozenset.
+    """
+
+    def __init__(self, excluded_paths: List[str]):
+        """
+        Compiles the excluded paths.
+
+        Args:
+            excluded_paths (List[str]): Exact paths and '*' prefix rules.
+        """
+        exact = set()
+        self._trie = {}
+        for excluded_path in excluded_paths:
+            if excluded_path.endswith('*'):
+                node = self._trie
+                for char in excluded_path[:-1]:
+                    node = node.setdefault(char, {})
+                node[None] = True
+            elif excluded_path.endswith('/'):
+                exact.add(excluded_path)
+            else:
+                exact.add(excluded_path + '/')
+        self._exact = frozenset(exact)
+
+    def __bool__(self) -> bool:
+        """
+        Returns whether any path is excluded.
+        """
+        return bool(self._exact or self._trie)
+
+    def matches(self, path: str) -> bool:
+        """
+        Returns whether a path ending with '/' is excluded.
+        """
+        if path in self._exact:
+            return True
+        node = self._trie
+        for char in path:
+            if None in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return None in node
+
+
+@lru_cache(maxsize=128)
+def compile_exclusions(excluded_paths: Tuple[str, ...]) -> ExclusionMatcher:
+    """
+    Returns the matcher of excluded paths, compiled once per tuple.
+    """
+    return ExclusionMatcher(excluded_paths)
+
+
+class AuthContext:
+    """
+    Credentials of a request, read once, and the user they resolve to.
+
+    Attributes:
+        authorization (str): The Authorization header, or None.
+        session_id (str): The session cookie, or None.
+        method (str): The auth method which resolved the user, or None.
+    """
+
+    def __init__(self, auth: 'Auth', request=None):
+        """
+        Reads the credentials of a request.
+
+        Args:
+            auth (Auth): The Auth resolving the user.
+            request (flask.Request): The request, or None.
+        """
+        self.authorization = auth.authorization_header(request)
+        self.session_id = auth.session_cookie(request)
+        self.method = None
+        self._auth = auth
+        self._user = None
+        self._resolved = False
+
+    @property
+    def user(self) -> TypeVar('User'):
+        """
+        The user of the request, resolved on first access.
+        """
+        if not self._resolved:
+            self._user = self._auth.resolve_user(self)
+            self._resolved = True
+            if self._user is not None:
+                self.method = self._auth.auth_method
+        return self._user
+
+
+def _is_current_request(req) -> bool:
+    """
+    Returns whether req is the request Flask is handling.
+    """
+    return has_request_context() and (
+        req is request or req is request._get_current_object())
+
+
 class Auth:
     """Auth class to manage API authentication."""
 
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    auth_method = None
+
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], ExclusionMatcher]
+                     ) -> bool:
         """
         Determines if authentication is required for a given path.
+
+        Args:
+            path (str): The path of the request.
+            excluded_paths: The paths not requiring authentication, as a
+            list of exact paths and '*' prefix rules or compiled in an
+            ExclusionMatcher.
+
+        Returns:
+            bool: False if the path is excluded, True otherwise.
         """
         if path is None:
             return True
         if not excluded_paths:
             return True
+        if not isinstance(excluded_paths, ExclusionMatcher):
+            excluded_paths = compile_exclusions(tuple(excluded_paths))
         if not path.endswith('/'):
             path += '/'
-        return path not in excluded_paths
+        return not excluded_paths.matches(path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -34,10 +156,40 @@ class Auth:
             return None
         return request.headers.get('Authorization')
 
+    def request_context(self, request=None) -> AuthContext:
+        """
+        Returns the auth context of a request, created once per request
+        Flask is handling and kept on flask.g.
+
+        Args:
+            request: The Flask request object.
+
+        Returns:
+            AuthContext: The credentials and user of the request.
+        """
+        if not _is_current_request(request):
+            return AuthContext(self, request)
+        context = g.get('auth_context')
+        if context is None or context._auth is not self:
+            context = g.auth_context = AuthContext(self, request)
+        return context
+
     def current_user(self, request=None) -> TypeVar('User'):
         """
         Retrieves the current user from the request.
         """
+        return self.request_context(request).user
+
+    def resolve_user(self, context: AuthContext) -> TypeVar('User'):
+        """
+        Resolves the user of the credentials of a request.
+
+        Args:
+            context (AuthContext): The credentials of the request.
+
+        Returns:
+            User: The authenticated User, or None.
+        """
         return None
 
     def session_cookie(self, request=None):
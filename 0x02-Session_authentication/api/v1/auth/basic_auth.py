@@ -1,17 +1,129 @@
 #!/usr/bin/env python3
 """ Module for Basic Authentication """
 import base64
-from typing import Tuple, TypeVar
-from api.v1.auth.auth import Auth
+import hashlib
+import hmac
+import os
+import threading
+import time
+from typing import Dict, Tuple, TypeVar
+from api.v1.auth.auth import Auth, AuthContext
 from models.user import User
 
 
+class CredentialCache:
+    """
+    Bounded TTL/LRU cache of verified Authorization headers.
+
+    Headers are keyed by their HMAC under a per-process key, so that no
+    credentials are kept in memory, and map to the ID of their user.
+    A cached header stops matching once its user is removed, saved or
+    changes password.
+    """
+
+    def __init__(self, ttl: int = 300, max_size: int = 1024):
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl (int): Seconds a header stays cached, 0 for no limit.
+            max_size (int): Maximum number of headers, 0 disables the cache.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._key = os.urandom(32)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _digest(self, authorization_header: str) -> bytes:
+        """
+        Returns the keyed hash of an Authorization header.
+        """
+        return hmac.new(self._key, authorization_header.encode('utf-8'),
+                        hashlib.sha256).digest()
+
+    def get(self, authorization_header: str) -> TypeVar('User'):
+        """
+        Returns the User verified for an Authorization header.
+
+        Args:
+            authorization_header (str): The raw Authorization header.
+
+        Returns:
+            User: The cached User, or None if the header isn't cached, has
+            expired or its user has changed since.
+        """
+        digest = self._digest(authorization_header)
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, password, updated_at, expires = entry
+            user = User.get(user_id)
+            if user is None or user.password != password or \
+                    user.updated_at != updated_at or \
+                    (expires is not None and expires <= time.monotonic()):
+                self.misses += 1
+                return None
+            self._entries[digest] = entry
+            self.hits += 1
+            return user
+
+    def set(self, authorization_header: str, user: TypeVar('User')):
+        """
+        Caches the User verified for an Authorization header, evicting
+        the least recently used headers beyond max_size.
+
+        Args:
+            authorization_header (str): The raw Authorization header.
+            user (User): The User it authenticates.
+        """
+        if self.max_size <= 0:
+            return
+        digest = self._digest(authorization_header)
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._entries[digest] = (user.id, user.password,
+                                     user.updated_at, expires)
+            while len(self._entries) > self.max_size:
+                del self._entries[next(iter(self._entries))]
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            Dict[str, float]: The number of cached headers (size), of
+            lookups served (hits) and not served (misses) from the cache,
+            of headers evicted and the hit ratio.
+        """
+        total = self.hits + self.misses
+        return {"size": len(self._entries), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_ratio": self.hits / total if total else 0.0}
+
+
 class BasicAuth(Auth):
     """
     BasicAuth class that inherits from Auth.
     Provides Basic Authentication mechanisms.
+
+    Verified Authorization headers are cached for BASIC_AUTH_CACHE_TTL
+    seconds (default 300), up to BASIC_AUTH_CACHE_SIZE of them (default
+    1024, 0 disables the cache).
     """
 
+    auth_method = "basic"
+    credential_cache = CredentialCache(
+        int(os.getenv("BASIC_AUTH_CACHE_TTL", "300")),
+        int(os.getenv("BASIC_AUTH_CACHE_SIZE", "1024")))
+
     def extract_base64_authorization_header(self,
                                             authorization_header: str) -> str:
         """
@@ -106,14 +218,18 @@ class BasicAuth(Auth):
 
         return user
 
-    def current_user(self, request=None) -> TypeVar('User'):
+    def resolve_user(self, context: AuthContext) -> TypeVar('User'):
         """
-        Retrieves the User instance for a request.
+        Resolves the User of the Authorization header of a request.
         """
-        auth_header = self.authorization_header(request)
+        auth_header = context.authorization
         if not auth_header:
             return None
 
+        user = BasicAuth.credential_cache.get(auth_header)
+        if user is not None:
+            return user
+
         base64_header = self.extract_base64_authorization_header(auth_header)
         if not base64_header:
             return None
@@ -126,4 +242,7 @@ class BasicAuth(Auth):
         if not user_email or not user_pwd:
             return None
 
-        return self.user_object_from_credentials(user_email, user_pwd)
+        user = self.user_object_from_credentials(user_email, user_pwd)
+        if user is not None:
+            BasicAuth.credential_cache.set(auth_header, user)
+        return user
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """ Module for Session Authentication """
-from api.v1.auth.auth import Auth
+from api.v1.auth.auth import Auth, AuthContext
+from api.v1.auth.session_store import make_session_store
 from uuid import uuid4
 from models.user import User
 
@@ -8,7 +9,10 @@ from models.user import User
 class SessionAuth(Auth):
     """SessionAuth class for session authentication."""
 
-    user_id_by_session_id = {}
+    auth_method = "session"
+    session_store = make_session_store()
+    # sessions of the in-memory store, empty with the shared stores
+    user_id_by_session_id = getattr(session_store, 'sessions', {})
 
     def create_session(self, user_id: str = None) -> str:
         """
@@ -17,7 +21,7 @@ class SessionAuth(Auth):
         if not user_id or not isinstance(user_id, str):
             return None
         usr_id = str(uuid4())
-        SessionAuth.user_id_by_session_id[usr_id] = user_id
+        SessionAuth.session_store.set(usr_id, user_id)
         return usr_id
 
     def user_id_for_session_id(self, session_id: str = None) -> str:
@@ -26,14 +30,13 @@ class SessionAuth(Auth):
         """
         if not session_id or not isinstance(session_id, str):
             return None
-        return SessionAuth.user_id_by_session_id.get(session_id)
+        return SessionAuth.session_store.get(session_id)
 
-    def current_user(self, request=None):
+    def resolve_user(self, context: AuthContext):
         """
-        returns user based on cookie value
+        returns user of the session cookie of a request
         """
-        sesh_cookie = self.session_cookie(request)
-        usr_id = self.user_id_for_session_id(sesh_cookie)
+        usr_id = self.user_id_for_session_id(context.session_id)
         return User.get(usr_id)
 
     def destroy_session(self, request=None):
@@ -42,11 +45,7 @@ class SessionAuth(Auth):
         """
         if not request:
             return False
-        sesh_cookie = self.session_cookie(request)
+        sesh_cookie = self.request_context(request).session_id
         if not sesh_cookie:
             return False
-        usr_id = self.user_id_for_session_id(sesh_cookie)
-        if not usr_id:
-            return False
-        SessionAuth.user_id_by_session_id.pop(sesh_cookie)
-        return True
+        return SessionAuth.session_store.delete(sesh_cookie)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+""" Module of session stores for Session Authentication
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from os import getenv
+import heapq
+import sqlite3
+import threading
+import time
+
+
+class SessionStore(ABC):
+    """ Interface of the stores mapping session IDs to user IDs
+    """
+
+    @abstractmethod
+    def set(self, session_id: str, user_id: str) -> None:
+        """ Store the user ID of a session
+        """
+
+    @abstractmethod
+    def get(self, session_id: str) -> str:
+        """ Return the user ID of a session, None if it doesn't exist
+        or has expired
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """ Remove a session, return False if it didn't exist
+        """
+
+    def stats(self) -> dict:
+        """ Return the number of active sessions and of evicted ones,
+        when the store keeps track of them
+        """
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """ Process-local store, with a TTL and bounded in size
+
+    sessions maps session IDs to user IDs, and records holds their
+    created_at and last_seen times. Sessions older than ttl seconds
+    expire (0 disables it), and the least recently used sessions are
+    evicted beyond max_size (0 disables it). Expired sessions are evicted
+    every sweep_interval seconds by a background thread popping them from
+    a heap ordered by expiry, without scanning the other sessions.
+
+    Heap entries of deleted, evicted or renewed sessions are skipped when
+    popped, and the heap is rebuilt from the live sessions once it holds
+    more than twice as many entries, so it stays bounded by max_size.
+    """
+
+    def __init__(self, ttl: int = 0, max_size: int = 0,
+                 sweep_interval: float = 60):
+        """ Initialize an empty store
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        self.sessions = {}
+        self.records = {}
+        self.evictions = 0
+        self._expiries = []
+        self._sweeper = None
+        self._lock = threading.Lock()
+
+    def _expires_at(self, record: dict) -> datetime:
+        """ Return the expiry time of a session record
+        """
+        return record['created_at'] + timedelta(seconds=self.ttl)
+
+    def _expired(self, record: dict, now: datetime) -> bool:
+        """ Return whether a session record has expired
+        """
+        return self.ttl > 0 and self._expires_at(record) <= now
+
+    def _remove(self, session_id: str) -> bool:
+        """ Remove a session, its heap entry is dropped lazily
+        """
+        self.records.pop(session_id, None)
+        return self.sessions.pop(session_id, None) is not None
+
+    def _compact(self):
+        """ Rebuild the heap from the live sessions once it holds more
+        than twice as many entries
+        """
+        if len(self._expiries) <= 2 * len(self.records) + 16:
+            return
+        self._expiries = [(self._expires_at(record), session_id)
+                          for session_id, record in self.records.items()]
+        heapq.heapify(self._expiries)
+
+    def _start_sweeper(self):
+        """ Start the background thread evicting expired sessions, once
+        """
+        def _sweep_periodically():
+            while True:
+                time.sleep(self.sweep_interval)
+                self.sweep()
+
+        self._sweeper = threading.Thread(
+            target=_sweep_periodically, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def sweep(self) -> int:
+        """ Evict the expired sessions, return how many were
+        """
+        now = datetime.utcnow()
+        evicted = 0
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                _, session_id = heapq.heappop(self._expiries)
+                record = self.records.get(session_id)
+                if record is not None and self._expired(record, now):
+                    self._remove(session_id)
+                    evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """ Store the user ID of a session
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            self._remove(session_id)
+            self.sessions[session_id] = user_id
+            self.records[session_id] = {'created_at': now, 'last_seen': now}
+            while self.max_size > 0 and len(self.sessions) > self.max_size:
+                self._remove(next(iter(self.sessions)))
+                self.evictions += 1
+            if self.ttl > 0:
+                heapq.heappush(self._expiries,
+                               (self._expires_at(self.records[session_id]),
+                                session_id))
+                self._compact()
+                if self._sweeper is None:
+                    self._start_sweeper()
+
+    def get(self, session_id: str) -> str:
+        """ Return the user ID of a session, None if it doesn't exist
+        or has expired
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            user_id = self.sessions.pop(session_id, None)
+            if user_id is None:
+                return None
+            record = self.records[session_id]
+            if self._expired(record, now):
+                del self.records[session_id]
+                self.evictions += 1
+                return None
+            record['last_seen'] = now
+            self.sessions[session_id] = user_id
+            return user_id
+
+    def delete(self, session_id: str) -> bool:
+        """ Remove a session, return False if it didn't exist
+        """
+        with self._lock:
+            removed = self._remove(session_id)
+            self._compact()
+            return removed
+
+    def stats(self) -> dict:
+        """ Return the number of active sessions and of evicted ones
+        """
+        return {'sessions': len(self.sessions),
+                'session_evictions': self.evictions}
+
+
+class SQLiteSessionStore(SessionStore):
+    """ Store in a SQLite file, shared by all processes using it
+
+    Sessions are kept in the table named table, and expire when older
+    than ttl seconds (0 disables it). Expired sessions are purged every
+    PURGE_EVERY new sessions.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, db_path: str, ttl: int = 0,
+                 table: str = "sessions"):
+        """ Open, and create if needed, the table of db_path
+        """
+        if not table.isidentifier():
+            raise ValueError("invalid table name: {}".format(table))
+        self.ttl = ttl
+        self.table = table
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, timeout=10,
+                                   isolation_level=None,
+                                   check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS {} ("
+                "session_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, "
+                "expires_at REAL)".format(table))
+            self._db.execute("CREATE INDEX IF NOT EXISTS {0}_expires "
+                             "ON {0} (expires_at)".format(table))
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """ Store the user ID of a session
+        """
+        expires_at = time.time() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO {} "
+                             "VALUES (?, ?, ?)".format(self.table),
+                             (session_id, user_id, expires_at))
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self.evictions += self._db.execute(
+                    "DELETE FROM {} WHERE expires_at <= ?".format(self.table),
+                    (time.time(),)).rowcount
+
+    def get(self, session_id: str) -> str:
+        """ Return the user ID of a session, None if it doesn't exist
+        or has expired
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT user_id FROM {} WHERE session_id = ? AND "
+                "(expires_at IS NULL OR expires_at > ?)".format(self.table),
+                (session_id, time.time())).fetchone()
+        return row[0] if row else None
+
+    def delete(self, session_id: str) -> bool:
+        """ Remove a session, return False if it didn't exist
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM {} WHERE session_id = ?".format(self.table),
+                (session_id,))
+        return cursor.rowcount > 0
+
+    def stats(self) -> dict:
+        """ Return the number of active sessions and of those purged
+        by this process
+        """
+        with self._lock:
+            count = self._db.execute(
+                "SELECT COUNT(*) FROM {} WHERE expires_at IS NULL OR "
+                "expires_at > ?".format(self.table),
+                (time.time(),)).fetchone()[0]
+        return {'sessions': count, 'session_evictions': self.evictions}
+
+
+class RedisSessionStore(SessionStore):
+    """ Store in Redis, or any client with the get/set/delete methods
+    of redis-py, shared by all processes using it
+
+    Sessions older than ttl seconds expire (0 disables it).
+    """
+
+    def __init__(self, client, ttl: int = 0, prefix: str = "session:"):
+        """ Initialize the store over a Redis client
+        """
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: int = 0,
+                 prefix: str = "session:") -> 'RedisSessionStore':
+        """ Return a store connected to the Redis server at url
+        Requires the redis package
+        """
+        import redis
+        return cls(redis.Redis.from_url(url), ttl, prefix)
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """ Store the user ID of a session
+        """
+        self.client.set(self.prefix + session_id, user_id,
+                        ex=self.ttl if self.ttl > 0 else None)
+
+    def get(self, session_id: str) -> str:
+        """ Return the user ID of a session, None if it doesn't exist
+        or has expired
+        """
+        user_id = self.client.get(self.prefix + session_id)
+        if isinstance(user_id, bytes):
+            user_id = user_id.decode('utf-8')
+        return user_id
+
+    def delete(self, session_id: str) -> bool:
+        """ Remove a session, return False if it didn't exist
+        """
+        return self.client.delete(self.prefix + session_id) > 0
+
+
+def make_session_store(kind: str = "session", ttl: int = None,
+                       max_size: int = None) -> SessionStore:
+    """ Return the store of kind selected by SESSION_STORE:
+    memory (default), sqlite or redis
+
+    Entries expire after ttl seconds, SESSION_DURATION by default (0, the
+    default, disables it). The memory store keeps at most max_size
+    entries, SESSION_STORE_MAX_SIZE by default (0 disables it), and
+    evicts the expired ones every SESSION_SWEEP_INTERVAL seconds (default
+    60). The sqlite store uses the table <kind>s of the SESSION_STORE_PATH
+    file and the redis store the keys <kind>:* of SESSION_STORE_URL.
+    """
+    backend = getenv("SESSION_STORE", "memory")
+    if ttl is None:
+        try:
+            ttl = int(getenv("SESSION_DURATION", "0"))
+        except ValueError:
+            ttl = 0
+    if backend == "sqlite":
+        return SQLiteSessionStore(
+            getenv("SESSION_STORE_PATH", ".db_sessions.sqlite"), ttl,
+            kind + "s")
+    if backend == "redis":
+        return RedisSessionStore.from_url(
+            getenv("SESSION_STORE_URL", "redis://localhost:6379/0"), ttl,
+            kind + ":")
+    if max_size is None:
+        max_size = int(getenv("SESSION_STORE_MAX_SIZE", "100000"))
+    return MemorySessionStore(
+        ttl, max_size, float(getenv("SESSION_SWEEP_INTERVAL", "60")))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+""" Module for signed Session Authentication """
+from api.v1.auth.session_auth import SessionAuth
+from api.v1.auth.session_store import make_session_store
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+
+class SignedSessionAuth(SessionAuth):
+    """SignedSessionAuth class for stateless session authentication.
+
+    The session ID is a token carrying the user ID, its expiry time and a
+    nonce, signed with HMAC-SHA256 under SESSION_SECRET, so any worker
+    sharing the secret can verify it without a session store. Tokens
+    expire after SESSION_DURATION seconds (default 86400), both must be
+    set.
+
+    Destroyed tokens are denied until they expire through a denylist kept
+    in the session store selected by SESSION_STORE, shared by all workers
+    with the sqlite and redis stores. Entries are never dropped before
+    they expire: once the denylist holds SESSION_DENYLIST_SIZE tokens,
+    destroy_session() fails until some expire. The size isn't checked
+    with the redis store, whose keys expire on their own.
+    """
+
+    auth_method = "signed_session"
+    secret = os.getenv("SESSION_SECRET", "").encode()
+    session_duration = int(os.getenv("SESSION_DURATION", "86400") or 0)
+    denylist_size = int(os.getenv("SESSION_DENYLIST_SIZE", "10000"))
+    denylist = make_session_store("denied_token", ttl=session_duration,
+                                  max_size=0)
+
+    def __init__(self):
+        """
+        checks that tokens can be shared between workers and expire
+        """
+        if not self.secret:
+            raise ValueError("SESSION_SECRET must be set to use "
+                             "signed_session_auth")
+        if self.session_duration <= 0:
+            raise ValueError("SESSION_DURATION must be positive to use "
+                             "signed_session_auth")
+
+    def _sign(self, payload: str) -> str:
+        """
+        returns the signature of a token payload
+        """
+        digest = hmac.new(self.secret, payload.encode(),
+                          hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        creates a signed session token for a user
+        """
+        if not user_id or not isinstance(user_id, str):
+            return None
+        expires = int(time.time()) + self.session_duration
+        payload = "{}.{}.{}".format(user_id, expires, os.urandom(8).hex())
+        return "{}.{}".format(payload, self._sign(payload))
+
+    def _verify(self, session_id: str) -> str:
+        """
+        returns the user ID of a valid and unexpired token, else None
+        """
+        if not session_id or not isinstance(session_id, str):
+            return None
+        payload, _, signature = session_id.rpartition(".")
+        if not hmac.compare_digest(self._sign(payload).encode(),
+                                   signature.encode()):
+            return None
+        user_id, expires, _ = payload.rsplit(".", 2)
+        if int(expires) <= time.time():
+            return None
+        return user_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        returns user_id of a valid, unexpired and not destroyed token
+        """
+        user_id = self._verify(session_id)
+        if user_id is None or \
+                SignedSessionAuth.denylist.get(session_id) is not None:
+            return None
+        return user_id
+
+    def destroy_session(self, request=None):
+        """
+        logout user by denying its token until it expires
+        """
+        if not request:
+            return False
+        sesh_cookie = self.request_context(request).session_id
+        user_id = self.user_id_for_session_id(sesh_cookie)
+        if user_id is None:
+            return False
+        denylist = SignedSessionAuth.denylist
+        denied = denylist.stats().get('sessions')
+        if denied is not None and denied >= self.denylist_size:
+            sweep = getattr(denylist, 'sweep', None)
+            if sweep is not None:
+                sweep()
+            denied = denylist.stats().get('sessions')
+            if denied >= self.denylist_size:
+                return False
+        denylist.set(sesh_cookie, user_id)
+        return True
@@ -3,6 +3,7 @@
 """
 from flask import jsonify, abort
 from api.v1.views import app_views
+from os import getenv
 
 
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
@@ -19,10 +20,15 @@ def stats() -> str:
     """ GET /api/v1/stats
     Return:
       - the number of each objects
+      - with session authentication, the number of active sessions and
+        of sessions evicted
     """
     from models.user import User
     stats = {}
     stats['users'] = User.count()
+    if getenv("AUTH_TYPE") == "session_auth":
+        from api.v1.auth.session_auth import SessionAuth
+        stats.update(SessionAuth.session_store.stats())
     return jsonify(stats)
 
 
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+""" Benchmark of Auth.require_auth with a list or a compiled matcher
+
+Usage: ./bench_require_auth.py [number_of_rules]
+"""
+import sys
+import time
+
+from api.v1.auth.auth import Auth, ExclusionMatcher
+
+
+def legacy_require_auth(path: str, excluded_paths: list) -> bool:
+    """ Linear check against the list, as require_auth used to do """
+    if not path.endswith('/'):
+        path += '/'
+    return path not in excluded_paths
+
+
+def timed(func, excluded_paths, paths: list, repeat: int = 100) -> float:
+    """ Return the average time of a check in nanoseconds """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            func(path, excluded_paths)
+    return (time.perf_counter() - start) / repeat / len(paths) * 1e9
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rules = ["/api/v1/resource{}/".format(i) for i in range(count)]
+    paths = ["/api/v1/users", "/api/v1/users/me", "/api/v1/status",
+             "/api/v1/resource{}".format(count - 1)]
+    auth = Auth()
+
+    matcher = ExclusionMatcher(rules)
+    for path in paths:
+        assert auth.require_auth(path, matcher) == \
+            legacy_require_auth(path, rules)
+
+    print("rules:    {}".format(count))
+    timings = [("legacy", legacy_require_auth, rules),
+               ("list", auth.require_auth, rules),
+               ("matcher", auth.require_auth, matcher),
+               ("wildcard", auth.require_auth,
+                ExclusionMatcher(rules + ["/api/v1/stat*"]))]
+    for name, func, excluded_paths in timings:
+        print("{:9} {:.0f}ns".format(name + ":", timed(func, excluded_paths,
+                                                       paths)))
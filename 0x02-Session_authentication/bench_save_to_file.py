@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+""" Benchmark of the peak memory of User.save_to_file
+
+Usage: ./bench_save_to_file.py [number_of_users]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models.base import DATA
+from models.user import User
+
+
+def legacy_save_to_file():
+    """ Previous save_to_file: a full copy of the store, then json.dump """
+    objs_json = {}
+    for obj_id, obj in DATA["User"].items():
+        objs_json[obj_id] = obj.to_json(True)
+    with open(".db_User.json", 'w') as f:
+        json.dump(objs_json, f)
+
+
+def measure(func) -> tuple:
+    """ Return the duration and peak traced memory of func in MB """
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return elapsed, (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    tracemalloc.start()
+    User.load_from_file()
+    for i in range(count):
+        user = User(email="user{}@hbtn.io".format(i), first_name="First")
+        DATA["User"][user.id] = user
+    store = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    print("store:     {:.1f}MB".format(store))
+    for name, func in (("legacy", legacy_save_to_file),
+                       ("streaming", User.save_to_file)):
+        elapsed, peak = measure(func)
+        print("{:9s}  {:.2f}s, peak +{:.1f}MB".format(name, elapsed, peak))
+    os.remove(".db_User.json")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+""" Benchmark of User.search by email, indexed or scanned
+
+Usage: ./bench_search.py [number_of_users]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from models.base import DATA, INDEXES
+from models.user import User
+
+
+def timed_search(attributes: dict, repeat: int = 100) -> float:
+    """ Return the average time of a search in microseconds """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        User.search(attributes)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    os.chdir(tempfile.mkdtemp())
+    with open(".db_User.json", "w") as f:
+        json.dump({"{:08d}".format(i): {
+            "id": "{:08d}".format(i),
+            "created_at": "2024-09-06T02:54:11",
+            "updated_at": "2024-09-06T02:54:11",
+            "email": "user{}@hbtn.io".format(i),
+            "_password": None,
+            "first_name": "First{}".format(i),
+            "last_name": None} for i in range(count)}, f)
+
+    start = time.perf_counter()
+    User.load_from_file()
+    print("load:             {:.2f}s".format(time.perf_counter() - start))
+
+    email = "user{}@hbtn.io".format(count - 1)
+    indexed = timed_search({"email": email})
+    scanned = timed_search({"first_name": "First{}".format(count - 1)}, 3)
+    print("search indexed:   {:.1f}us".format(indexed))
+    print("search scanned:   {:.1f}us".format(scanned))
+
+    INDEXES["User"] = {}
+    User.INDEXED_ATTRIBUTES = ()
+    print("search unindexed: {:.1f}us".format(timed_search({"email": email},
+                                                           3)))
+    os.remove(".db_User.json")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+""" Benchmark of the memory used per User, with and without __slots__
+
+Usage: ./bench_user_memory.py [number_of_users]
+"""
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from models.user import User
+
+
+class LegacyUser():
+    """ User with its attributes in a __dict__, as before __slots__ """
+
+    def __init__(self, email: str):
+        """ Initialize the attributes like User """
+        self.id = str(uuid.uuid4())
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+        self.email = email
+        self._password = None
+        self.first_name = None
+        self.last_name = None
+
+
+def bytes_per_user(cls: type, count: int) -> float:
+    """ Return the average traced memory of one instance of cls """
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    users = [cls(email="user{}@hbtn.io".format(i)) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del users
+    return used / count
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy = bytes_per_user(LegacyUser, count)
+    compact = bytes_per_user(User, count)
+    print("__dict__:  {:.0f} bytes/user".format(legacy))
+    print("__slots__: {:.0f} bytes/user ({:.0f}%)".format(
+        compact, 100 * compact / legacy))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+""" Tests of the session stores, the Redis one against a local fake
+"""
+from datetime import datetime, timedelta
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api.v1.auth import session_store
+from api.v1.auth.session_store import (MemorySessionStore,
+                                       RedisSessionStore, SessionStore,
+                                       SQLiteSessionStore)
+
+
+class Clock:
+    """ Controllable wall clock """
+
+    def __init__(self):
+        """ Start the clock at a fixed time """
+        self.now = datetime(2024, 9, 6, 2, 54, 11)
+
+    def advance(self, seconds: float):
+        """ Move the clock forward """
+        self.now += timedelta(seconds=seconds)
+
+    def utcnow(self) -> datetime:
+        """ Current time, like datetime.utcnow """
+        return self.now
+
+    def time(self) -> float:
+        """ Current time, like time.time """
+        return (self.now - datetime(1970, 1, 1)).total_seconds()
+
+
+class FakeRedis:
+    """ In-process stand-in for a redis-py client """
+
+    def __init__(self, clock: Clock):
+        """ Initialize an empty server following clock """
+        self.clock = clock
+        self.data = {}
+
+    def set(self, key: str, value: str, ex: int = None):
+        """ Set a key, expiring after ex seconds """
+        expires = self.clock.time() + ex if ex else None
+        self.data[key] = (value.encode(), expires)
+        return True
+
+    def get(self, key: str) -> bytes:
+        """ Value of a key, None once it has expired """
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= self.clock.time():
+            del self.data[key]
+            return None
+        return value
+
+    def delete(self, key: str) -> int:
+        """ Delete a key, return the number of keys deleted """
+        if self.get(key) is None:
+            return 0
+        del self.data[key]
+        return 1
+
+
+class StoreTests:
+    """ Tests shared by all stores """
+
+    def make_store(self, ttl: int = 0) -> SessionStore:
+        """ Return an empty store """
+        raise NotImplementedError
+
+    def setUp(self):
+        """ Freeze the clocks of the stores """
+        self.clock = Clock()
+        patches = [mock.patch.object(session_store, 'datetime', self.clock),
+                   mock.patch.object(session_store.time, 'time',
+                                     self.clock.time)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_set_get(self):
+        """ A stored session resolves to its user ID """
+        store = self.make_store()
+        store.set("s1", "u1")
+        store.set("s2", "u2")
+        self.assertEqual(store.get("s1"), "u1")
+        self.assertEqual(store.get("s2"), "u2")
+        self.assertIsNone(store.get("s3"))
+
+    def test_delete(self):
+        """ A deleted session no longer resolves """
+        store = self.make_store()
+        store.set("s1", "u1")
+        self.assertTrue(store.delete("s1"))
+        self.assertIsNone(store.get("s1"))
+        self.assertFalse(store.delete("s1"))
+
+    def test_expiry(self):
+        """ Sessions expire after ttl seconds """
+        store = self.make_store(ttl=60)
+        store.set("s1", "u1")
+        self.clock.advance(59)
+        self.assertEqual(store.get("s1"), "u1")
+        self.clock.advance(1)
+        self.assertIsNone(store.get("s1"))
+
+    def test_no_expiry(self):
+        """ Sessions never expire with a ttl of 0 """
+        store = self.make_store(ttl=0)
+        store.set("s1", "u1")
+        self.clock.advance(10 ** 8)
+        self.assertEqual(store.get("s1"), "u1")
+
+
+class TestMemorySessionStore(StoreTests, unittest.TestCase):
+    """ Tests of MemorySessionStore """
+
+    def make_store(self, ttl: int = 0, max_size: int = 0) -> SessionStore:
+        """ Return an empty memory store """
+        return MemorySessionStore(ttl, max_size)
+
+    def test_lru_eviction(self):
+        """ The least recently used sessions are evicted beyond max_size """
+        store = self.make_store(max_size=2)
+        store.set("s1", "u1")
+        store.set("s2", "u2")
+        store.get("s1")
+        store.set("s3", "u3")
+        self.assertIsNone(store.get("s2"))
+        self.assertEqual(store.get("s1"), "u1")
+        self.assertEqual(store.get("s3"), "u3")
+
+    def test_sessions(self):
+        """ sessions maps session IDs to user IDs """
+        store = self.make_store(ttl=60)
+        store.set("s1", "u1")
+        self.assertEqual(store.sessions, {"s1": "u1"})
+
+    def test_sweep(self):
+        """ Expired sessions are swept and counted as evictions """
+        store = self.make_store(ttl=60)
+        store.set("s1", "u1")
+        self.clock.advance(30)
+        store.set("s2", "u2")
+        self.clock.advance(30)
+        self.assertEqual(store.sweep(), 1)
+        self.assertEqual(store.sessions, {"s2": "u2"})
+        self.assertEqual(store.stats(),
+                         {'sessions': 1, 'session_evictions': 1})
+
+    def test_bounded_heap(self):
+        """ Deleted and evicted sessions don't pile up in the heap """
+        store = self.make_store(ttl=3600, max_size=10)
+        for i in range(1000):
+            store.set("s{}".format(i), "u")
+            store.delete("s{}".format(i - 1))
+        self.assertLessEqual(len(store._expiries), 2 * 10 + 16)
+        for i in range(1000):
+            store.set("s{}".format(i), "u")
+        self.assertEqual(len(store.sessions), 10)
+        self.assertLessEqual(len(store._expiries), 2 * 10 + 16)
+
+
+class TestSQLiteSessionStore(StoreTests, unittest.TestCase):
+    """ Tests of SQLiteSessionStore """
+
+    def make_store(self, ttl: int = 0) -> SessionStore:
+        """ Return an empty store in a temporary file """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = SQLiteSessionStore(
+            os.path.join(directory.name, "sessions.sqlite"), ttl)
+        self.addCleanup(store._db.close)
+        return store
+
+    def test_shared_file(self):
+        """ Stores over the same file share their sessions """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        db_path = os.path.join(directory.name, "sessions.sqlite")
+        first = SQLiteSessionStore(db_path)
+        second = SQLiteSessionStore(db_path)
+        first.set("s1", "u1")
+        self.assertEqual(second.get("s1"), "u1")
+        self.assertTrue(second.delete("s1"))
+        self.assertIsNone(first.get("s1"))
+        first._db.close()
+        second._db.close()
+
+
+class TestRedisSessionStore(StoreTests, unittest.TestCase):
+    """ Tests of RedisSessionStore against FakeRedis """
+
+    def make_store(self, ttl: int = 0) -> SessionStore:
+        """ Return a store over an empty fake server """
+        self.server = FakeRedis(self.clock)
+        return RedisSessionStore(self.server, ttl)
+
+    def test_prefix(self):
+        """ Sessions are stored under the prefix """
+        store = self.make_store()
+        store.set("s1", "u1")
+        self.assertIn("session:s1", self.server.data)
+
+
+class TestSessionStore(unittest.TestCase):
+    """ Tests of the SessionStore interface """
+
+    def test_abstract(self):
+        """ Stores must implement set, get and delete """
+        with self.assertRaises(TypeError):
+            SessionStore()
+
+        class Incomplete(SessionStore):
+            """ Store without delete """
+
+            def set(self, session_id, user_id):
+                """ Nothing """
+
+            def get(self, session_id):
+                """ Nothing """
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+""" Tests of SignedSessionAuth and its denylist
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api.v1.auth.session_store import SQLiteSessionStore
+from api.v1.auth.signed_session_auth import SignedSessionAuth
+
+
+class FakeRequest:
+    """ Request carrying a session cookie only """
+
+    def __init__(self, session_id: str):
+        """ Initialize with the cookie value """
+        self.headers = {}
+        self.cookies = {os.getenv('SESSION_NAME', '_my_session_id'):
+                        session_id}
+
+
+class TestSignedSessionAuth(unittest.TestCase):
+    """ Tests of SignedSessionAuth """
+
+    def setUp(self):
+        """ Use a fixed secret and a denylist in a temporary file """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db_path = os.path.join(directory.name, "sessions.sqlite")
+        self.denylist = SQLiteSessionStore(self.db_path, 3600,
+                                           "denied_tokens")
+        self.addCleanup(self.denylist._db.close)
+        patches = [
+            mock.patch.object(SignedSessionAuth, 'secret', b'secret'),
+            mock.patch.object(SignedSessionAuth, 'session_duration', 3600),
+            mock.patch.object(SignedSessionAuth, 'denylist_size', 2),
+            mock.patch.object(SignedSessionAuth, 'denylist', self.denylist),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.auth = SignedSessionAuth()
+
+    def test_secret_required(self):
+        """ A missing SESSION_SECRET is an error, not a random key """
+        with mock.patch.object(SignedSessionAuth, 'secret', b''):
+            with self.assertRaises(ValueError):
+                SignedSessionAuth()
+
+    def test_duration_required(self):
+        """ Tokens must expire """
+        with mock.patch.object(SignedSessionAuth, 'session_duration', 0):
+            with self.assertRaises(ValueError):
+                SignedSessionAuth()
+
+    def test_verify(self):
+        """ Only untampered tokens resolve to their user ID """
+        token = self.auth.create_session("u1")
+        self.assertEqual(self.auth.user_id_for_session_id(token), "u1")
+        self.assertIsNone(self.auth.user_id_for_session_id(token + "x"))
+        self.assertIsNone(
+            self.auth.user_id_for_session_id("u2" + token[2:]))
+
+    def test_destroy_shared(self):
+        """ Destroyed tokens are denied by every worker """
+        token = self.auth.create_session("u1")
+        self.assertTrue(self.auth.destroy_session(FakeRequest(token)))
+        self.assertIsNone(self.auth.user_id_for_session_id(token))
+        other = SQLiteSessionStore(self.db_path, 3600, "denied_tokens")
+        self.addCleanup(other._db.close)
+        with mock.patch.object(SignedSessionAuth, 'denylist', other):
+            self.assertIsNone(
+                SignedSessionAuth().user_id_for_session_id(token))
+        self.assertFalse(self.auth.destroy_session(FakeRequest(token)))
+
+    def test_full_denylist(self):
+        """ A full denylist refuses logouts and keeps its tokens """
+        tokens = [self.auth.create_session("u1") for _ in range(3)]
+        self.assertTrue(self.auth.destroy_session(FakeRequest(tokens[0])))
+        self.assertTrue(self.auth.destroy_session(FakeRequest(tokens[1])))
+        self.assertFalse(self.auth.destroy_session(FakeRequest(tokens[2])))
+        self.assertEqual(self.auth.user_id_for_session_id(tokens[2]), "u1")
+        for token in tokens[:2]:
+            self.assertIsNone(self.auth.user_id_for_session_id(token))
+
+
+if __name__ == "__main__":
+    unittest.main()
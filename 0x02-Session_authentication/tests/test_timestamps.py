@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+""" Tests of parse_timestamp and format_timestamp against
+datetime.strptime and datetime.strftime
+"""
+from datetime import datetime, timedelta, timezone
+import random
+import unittest
+
+from models.base import TIMESTAMP_FORMAT, format_timestamp, parse_timestamp
+
+
+MALFORMED = [
+    "",
+    "2024-09-06",
+    "2024-09-06 02:54:11",
+    "2024-09-06t02:54:11",
+    "2024-09-06T02:54:11Z",
+    "2024-09-06T02:54:11+00:00",
+    "2024-09-06T02:54:11.123456",
+    "2024-09-06T02:54",
+    " 2024-09-06T02:54:11",
+    "2024-09-06T02:54:11 ",
+    "2024-9-6T2:54:11",
+    "2024-02-30T00:00:00",
+    "2023-02-29T00:00:00",
+    "2024-13-01T00:00:00",
+    "2024-00-01T00:00:00",
+    "2024-09-00T00:00:00",
+    "2024-09-06T24:00:00",
+    "2024-09-06T02:60:00",
+    "2024-09-06T02:54:61",
+    "0000-01-01T00:00:00",
+    "+024-09-06T02:54:11",
+    "-024-09-06T02:54:11",
+    "2024-09-06T+2:54:11",
+    "2024-09-06T02:5a:11",
+    "2024_09_06T02:54:11",
+    "٢٠٢٤-09-06T02:54:11",
+    "2024-09-06T02:54:１１",
+    "abcd-ef-ghTij:kl:mn",
+    "20240906T025411",
+]
+
+
+def strptime(value: str):
+    """ datetime.strptime, or ValueError if it raises it """
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except ValueError:
+        return ValueError
+
+
+def parse(value: str):
+    """ parse_timestamp, or ValueError if it raises it """
+    try:
+        return parse_timestamp(value)
+    except ValueError:
+        return ValueError
+
+
+class TestTimestamps(unittest.TestCase):
+    """ Tests of the timestamp codec of models.base """
+
+    def test_round_trip(self):
+        """ Random datetimes format and parse like strftime/strptime """
+        rng = random.Random(42)
+        start = datetime(1, 1, 1)
+        span = (datetime(9999, 12, 31, 23, 59, 59) - start).total_seconds()
+        for _ in range(20000):
+            value = start + timedelta(seconds=rng.uniform(0, span))
+            text = format_timestamp(value)
+            self.assertEqual(text, value.strftime(TIMESTAMP_FORMAT))
+            self.assertEqual(parse(text), strptime(text))
+
+    def test_microseconds_dropped(self):
+        """ Microseconds are not formatted """
+        value = datetime(2024, 9, 6, 2, 54, 11, 999999)
+        self.assertEqual(format_timestamp(value), "2024-09-06T02:54:11")
+
+    def test_small_years(self):
+        """ Years before 1000 format like strftime """
+        for year in (1, 9, 10, 99, 100, 999, 1000):
+            value = datetime(year, 3, 4, 5, 6, 7)
+            text = format_timestamp(value)
+            self.assertEqual(text, value.strftime(TIMESTAMP_FORMAT))
+            self.assertEqual(parse(text), strptime(text))
+
+    def test_aware_datetimes(self):
+        """ Timezone aware datetimes format like strftime """
+        for offset in (0, 2, -5):
+            value = datetime(2024, 9, 6, 2, 54, 11,
+                             tzinfo=timezone(timedelta(hours=offset)))
+            self.assertEqual(format_timestamp(value),
+                             value.strftime(TIMESTAMP_FORMAT))
+
+    def test_malformed(self):
+        """ Malformed strings are rejected or parsed like strptime """
+        for value in MALFORMED:
+            with self.subTest(value=value):
+                self.assertEqual(parse(value), strptime(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
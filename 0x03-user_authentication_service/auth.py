@@ -5,6 +5,8 @@ Auth module
 from db import DB
 from user import User
 import bcrypt
+import os
+import time
 from sqlalchemy.orm.exc import NoResultFound
 from uuid import uuid4
 
@@ -15,24 +17,58 @@ def _generate_uuid() -> str:
     return str(uuid4())
 
 
-def _hash_password(password: str) -> bytes:
+def _hash_password(password: str, rounds: int = 12) -> bytes:
     """Hashes a password using bcrypt.
 
     Args:
         password (str): The password to hash.
+        rounds (int): The bcrypt work factor.
 
     Returns:
         bytes: The salted hash of the password.
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds)
     return bcrypt.hashpw(password.encode('utf-8'), salt)
 
 
+def _needs_rehash(hashed_password: bytes, rounds: int) -> bool:
+    """Tell whether a hash was made with a lower work factor than rounds,
+    so that hashes are only ever upgraded."""
+    try:
+        return int(hashed_password.split(b'$')[2]) < rounds
+    except (AttributeError, IndexError, ValueError):
+        return True
+
+
+def _calibrate_rounds(target_ms: float, minimum: int = 4) -> int:
+    """Find the highest bcrypt work factor hashing within target_ms
+    milliseconds on this machine."""
+    rounds = max(minimum, 4)
+    while rounds < 31:
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds))
+        if (time.perf_counter() - start) * 2000 > target_ms:
+            break
+        rounds += 1
+    return rounds
+
+
+def _bcrypt_rounds() -> int:
+    """Work factor of new hashes: BCRYPT_ROUNDS if set, else calibrated
+    against BCRYPT_TARGET_MS if set, else the bcrypt default of 12."""
+    if os.getenv("BCRYPT_ROUNDS"):
+        return int(os.getenv("BCRYPT_ROUNDS"))
+    if os.getenv("BCRYPT_TARGET_MS"):
+        return _calibrate_rounds(float(os.getenv("BCRYPT_TARGET_MS")))
+    return 12
+
+
 class Auth:
     """Auth class to interact with the authentication database."""
 
     def __init__(self):
         self._db = DB()
+        self._rounds = _bcrypt_rounds()
 
     def register_user(self, email: str, password: str) -> User:
         """Register a new user with the provided email and password."""
@@ -57,16 +93,25 @@ class Auth:
 
     def _hash_password(self, password: str) -> bytes:
         """Hashes the password using bcrypt and returns it as bytes."""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        return _hash_password(password, self._rounds)
 
     def valid_login(self, email: str, password: str) -> bool:
-        """Validate if the login attempt is valid."""
+        """Validate if the login attempt is valid.
+
+        On success, a password hashed with a lower work factor than the
+        current one is hashed again and stored.
+        """
         try:
             user = self._db.find_user_by(email=email)
-            return bcrypt.checkpw(
-                    password.encode('utf-8'), user.hashed_password)
+            if not bcrypt.checkpw(
+                    password.encode('utf-8'), user.hashed_password):
+                return False
         except NoResultFound:
             return False
+        if _needs_rehash(user.hashed_password, self._rounds):
+            self._db.update_user(
+                user.id, hashed_password=self._hash_password(password))
+        return True
 
     def get_user_from_session_id(self, session_id: str) -> User:
         """Return the user corresponding to